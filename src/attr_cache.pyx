@@ -0,0 +1,91 @@
+# cython: language_level=3
+import time
+from collections import OrderedDict
+from threading import RLock
+
+ATTR_TTL = 1.0  # seconds a positive getattr result is served from memory
+NEGATIVE_TTL = 0.5  # seconds an ENOENT result is remembered
+MAX_ATTR_ENTRIES = 100000
+
+
+class AttrCache:
+    # Node-local getattr cache keyed by normalised path. A cached value of None is a
+    # negative entry (path known not to exist).
+    def __init__(
+        self,
+        ttl=ATTR_TTL,
+        negative_ttl=NEGATIVE_TTL,
+        max_entries: int = MAX_ATTR_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, object]]" = OrderedDict()
+        self._lock = RLock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # ------------- helpers -------------
+    def _store(self, path: str, value, ttl):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(path, None)
+            self._entries[path] = (time.monotonic() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ------------- public API -------------
+    def lookup(self, path: str):
+        # -> (hit, attr); attr is None for a negative hit
+        with self._lock:
+            item = self._entries.get(path)
+            if item is not None:
+                expires, value = item
+                if expires > time.monotonic():
+                    if value is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return True, value
+                del self._entries[path]
+            self.misses += 1
+            return False, None
+
+    def put(self, path: str, attr):
+        self._store(path, attr, self.ttl)
+
+    def put_negative(self, path: str):
+        self._store(path, None, self.negative_ttl)
+
+    def invalidate(self, *paths):
+        with self._lock:
+            for p in paths:
+                if self._entries.pop(p, None) is not None:
+                    self.invalidations += 1
+
+    def invalidate_prefix(self, path: str):
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            keys = [k for k in self._entries if k == path or k.startswith(prefix)]
+            for k in keys:
+                del self._entries[k]
+            self.invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "ttl": self.ttl,
+                "negative_ttl": self.negative_ttl,
+            }
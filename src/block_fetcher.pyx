@@ -0,0 +1,240 @@
+# cython: language_level=3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+REMOTE_BLOCK_SIZE = 1024 * 1024  # remote reads are rounded to aligned 1 MB blocks
+MAX_TRACKED_EOFS = 4096
+STRIPE_MIN_BLOCKS = 4  # runs at least this long are split across replicas
+STRIPE_WORKERS = 8
+
+
+class _Flight:
+    # One in-progress fetch of a block; concurrent readers of the block wait on it
+    def __init__(self):
+        self.done = threading.Event()
+        self.data = None  # bytes, b"" past EOF, None when no peer could serve it
+
+
+class BlockFetcher:
+    # Serves remote reads in fixed-size aligned blocks stored in CacheManager.
+    # `fetch(path, size, offset, peer)` performs the raw remote read (no caching).
+    # Concurrent requests for a block share a single in-flight fetch. When `replicas(path)`
+    # is given, long runs are striped over all peers holding the file and fetched in parallel.
+    def __init__(
+        self,
+        fetch,
+        cache,
+        block_size: int = REMOTE_BLOCK_SIZE,
+        replicas=None,
+        stripe_min_blocks: int = STRIPE_MIN_BLOCKS,
+    ):
+        self.fetch = fetch
+        self.cache = cache
+        self.block_size = block_size
+        self.replicas = replicas
+        self.stripe_min_blocks = stripe_min_blocks
+        self._pool = ThreadPoolExecutor(
+            max_workers=STRIPE_WORKERS, thread_name_prefix="stripe"
+        )
+        self._inflight: dict[tuple[str, int], _Flight] = {}
+        self._eof: "OrderedDict[str, int]" = OrderedDict()  # learnt from short reads
+        self._lock = threading.Lock()
+
+    # ------------- helpers -------------
+    def _block_len(self, path: str, idx: int) -> int:
+        start = idx * self.block_size
+        eof = self._eof.get(path)
+        if eof is None:
+            return self.block_size
+        return max(0, min(self.block_size, eof - start))
+
+    def _cached_block(self, path: str, idx: int):
+        with self._lock:
+            n = self._block_len(path, idx)
+        if n == 0:
+            return b""
+        return self.cache.get(path, idx * self.block_size, n)
+
+    def _set_eof(self, path: str, eof: int):
+        with self._lock:
+            self._eof.pop(path, None)
+            self._eof[path] = eof
+            while len(self._eof) > MAX_TRACKED_EOFS:
+                self._eof.popitem(last=False)
+
+    def _stripe_peers(self, path: str, nblocks: int, peer) -> list:
+        if not self.replicas or nblocks < self.stripe_min_blocks:
+            return []
+        try:
+            peers = list(self.replicas(path))
+        except Exception:
+            return []
+        if peer in peers:
+            # Keep the handle's peer first so it gets the leading stripe
+            peers.remove(peer)
+            peers.insert(0, peer)
+        return peers if len(peers) > 1 else []
+
+    def _fetch_striped(self, path: str, first: int, last: int, peers: list) -> dict:
+        # Split the run into one contiguous stripe per replica and fetch them concurrently
+        nblocks = last - first + 1
+        per = -(-nblocks // len(peers))
+        stripes = []
+        for n, p in enumerate(peers):
+            s_first = first + n * per
+            if s_first > last:
+                break
+            stripes.append((s_first, min(last, s_first + per - 1), p))
+        futures = [
+            (st, self._pool.submit(self._fetch_single, path, st[0], st[1], st[2]))
+            for st in stripes
+        ]
+        out = {}
+        for st, fut in futures:
+            try:
+                part = fut.result()
+            except Exception:
+                part = {i: None for i in range(st[0], st[1] + 1)}
+            # Replica could not serve its stripe: try the remaining ones in turn
+            for alt in peers:
+                if not any(v is None for v in part.values()):
+                    break
+                if alt == st[2]:
+                    continue
+                try:
+                    part = self._fetch_single(path, st[0], st[1], alt)
+                except Exception:
+                    pass
+            out.update(part)
+            if any(v is not None and len(v) < self.block_size for v in part.values()):
+                break  # EOF inside this stripe; later stripes are past the end
+        for i in range(first, last + 1):
+            out.setdefault(i, b"")
+        return out
+
+    def _fetch_run(self, path: str, first: int, last: int, peer) -> dict:
+        # Fetch blocks [first, last] -> {idx: bytes | None}
+        peers = self._stripe_peers(path, last - first + 1, peer)
+        if peers:
+            return self._fetch_striped(path, first, last, peers)
+        return self._fetch_single(path, first, last, peer)
+
+    def _fetch_single(self, path: str, first: int, last: int, peer) -> dict:
+        # Fetch blocks [first, last] with one remote read from one peer
+        bs = self.block_size
+        offset = first * bs
+        size = (last - first + 1) * bs
+        data = self.fetch(path, size, offset, peer)
+        if data is None:
+            # Peer error: nothing is learnt about the file's end
+            return {i: None for i in range(first, last + 1)}
+        if 0 < len(data) < size or (not data and offset == 0):
+            # A successful short read ends the file; an empty one past offset 0 only says
+            # the end is somewhere before `offset` (striped fetches beyond EOF)
+            self._set_eof(path, offset + len(data))
+        out = {}
+        for i in range(first, last + 1):
+            rel = (i - first) * bs
+            block = data[rel : rel + bs]
+            if block:
+                try:
+                    self.cache.put(path, block, i * bs)
+                except Exception:
+                    pass
+            out[i] = block
+        return out
+
+    def _runs(self, idxs: list):
+        # Group sorted block indexes into contiguous (first, last) runs
+        runs = []
+        for i in idxs:
+            if runs and runs[-1][1] == i - 1:
+                runs[-1][1] = i
+            else:
+                runs.append([i, i])
+        return runs
+
+    # ------------- public API -------------
+    def get_blocks(self, path: str, first: int, last: int, peer=None) -> dict:
+        blocks = {}
+        missing = []
+        for i in range(first, last + 1):
+            data = self._cached_block(path, i)
+            if data is not None:
+                blocks[i] = data
+            else:
+                missing.append(i)
+        if not missing:
+            return blocks
+        owned, waiting = [], {}
+        with self._lock:
+            for i in missing:
+                flight = self._inflight.get((path, i))
+                if flight is None:
+                    self._inflight[(path, i)] = _Flight()
+                    owned.append(i)
+                else:
+                    waiting[i] = flight
+        try:
+            for run_first, run_last in self._runs(owned):
+                fetched = {}
+                try:
+                    fetched = self._fetch_run(path, run_first, run_last, peer)
+                finally:
+                    with self._lock:
+                        for i in range(run_first, run_last + 1):
+                            flight = self._inflight.pop((path, i), None)
+                            if flight is not None:
+                                flight.data = fetched.get(i)
+                                flight.done.set()
+                blocks.update(fetched)
+        finally:
+            # Never leave followers waiting if a fetch raised
+            with self._lock:
+                for i in owned:
+                    flight = self._inflight.pop((path, i), None)
+                    if flight is not None:
+                        flight.done.set()
+        for i, flight in waiting.items():
+            flight.done.wait()
+            blocks[i] = flight.data
+        return blocks
+
+    def read(self, path: str, size: int, offset: int, peer=None):
+        # Read [offset, offset + size) through aligned blocks; None when some block could
+        # not be fetched from any peer
+        if size <= 0:
+            return b""
+        bs = self.block_size
+        first = offset // bs
+        last = (offset + size - 1) // bs
+        blocks = self.get_blocks(path, first, last, peer)
+        parts = []
+        for i in range(first, last + 1):
+            data = blocks.get(i)
+            if data is None:
+                # A block no replica could serve fails the read: returning the blocks
+                # before it would look like a short read, i.e. EOF
+                return None
+            parts.append(data)
+            if len(data) < bs:
+                break  # EOF
+        buf = b"".join(parts)
+        rel = offset - first * bs
+        return buf[rel : rel + size]
+
+    def observe_size(self, path: str, size: int):
+        # Attributes seen for the file: a learnt EOF that disagrees (file grew or shrank
+        # since) is dropped and relearnt from the next short read
+        with self._lock:
+            eof = self._eof.get(path)
+            if eof is not None and eof != size:
+                del self._eof[path]
+
+    def forget(self, path: str):
+        with self._lock:
+            self._eof.pop(path, None)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
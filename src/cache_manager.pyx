@@ -143,8 +143,8 @@ class CacheManager:
             avail = self._covered_len(key, offset, size)
             if avail < size:
                 return None
-            # Memory
-            if key in self._mem:
+            # Memory (holds a prefix of the file; larger ranges come from disk)
+            if key in self._mem and offset + size <= len(self._mem[key]):
                 data = self._mem.pop(key)
                 self._mem[key] = data  # move to MRU
                 return data[offset : offset + size]
@@ -190,11 +190,14 @@ class CacheManager:
             except OSError:
                 pass
 
-            # Optionally store in memory
-            if size <= self.max_mem_file:
-                if offset > 0 and key in self._mem:
-                    existing_data = self._mem.pop(key)
-                    self._mem_size -= len(existing_data)
+            # Optionally store in memory: only the first max_mem_file bytes of a file are
+            # kept, as one buffer indexed by file offset. The buffer only grows contiguously:
+            # a write past its end (or after it was evicted) would leave a zero-filled gap
+            # that the extents claim as cached, so that data is served from disk instead.
+            contiguous = offset <= len(self._mem.get(key, b""))
+            if offset + size <= self.max_mem_file and contiguous:
+                if key in self._mem:
+                    existing_data = self._mem[key]
                     new_size = max(len(existing_data), offset + size)
                     new_data = bytearray(new_size)
                     new_data[: len(existing_data)] = existing_data
@@ -206,6 +209,11 @@ class CacheManager:
                 self._mem[key] = data
                 self._mem_size += len(data)
                 self._evict_mem()
+            elif key in self._mem and offset < len(self._mem[key]):
+                # Keep the in-memory prefix consistent with the part of this write it overlaps
+                existing_data = bytearray(self._mem[key])
+                existing_data[offset:] = data[: len(existing_data) - offset]
+                self._mem[key] = bytes(existing_data)
 
             # Record extent for both disk and memory
             self._add_extent(key, offset, offset + size)
@@ -1,4 +1,6 @@
 import argparse
+import logging
+import os
 import platform
 import signal
 import sys
@@ -6,11 +8,18 @@ import threading
 
 import fuse
 
+from attr_cache import ATTR_TTL, NEGATIVE_TTL, AttrCache
+from block_fetcher import REMOTE_BLOCK_SIZE
 from cache_manager import CacheManager
-from file_system import MultiCloudFS
-from grpc_client_manager import GrpcClientManager
+from file_handle import DURABILITY_MODES, DURABILITY_SYNC, MAX_WRITEBACK_BUFFER
+from file_system import METADATA_FLUSH_INTERVAL, MultiCloudFS
+from grpc_client_manager import HEARTBEAT_INTERVAL, HEARTBEAT_TTL, GrpcClientManager
 from grpc_server import serve
-from redis_client import RedisClient
+from near_cache import NEAR_CACHE_BYTES
+from readahead import READAHEAD_MAX
+from redis_client import INODE_ENCODINGS, INODE_HASH, RedisClient
+from replicator import REPLICATION_FACTOR
+from scanner import Scanner
 
 fuse.fuse_python_api = (0, 2)
 
@@ -38,10 +47,103 @@ def parse_args():
     parser.add_argument(
         "-u", "--redis_url", required=True, help="URL for the Redis server"
     )
+    parser.add_argument(
+        "--redis_cluster",
+        action="store_true",
+        help="--redis_url points at a Redis Cluster node; metadata is sharded by directory",
+    )
+    parser.add_argument(
+        "--inode_encoding",
+        choices=INODE_ENCODINGS,
+        default=INODE_HASH,
+        help="How inode records are written to Redis: one text field per value (hash) "
+        "or one compact binary record (packed); both are always readable",
+    )
+    parser.add_argument(
+        "--near_cache_size",
+        type=int,
+        default=NEAR_CACHE_BYTES,
+        help="Bytes of Redis metadata reads cached locally, kept coherent with client "
+        "tracking (0 disables; ignored with --redis_cluster)",
+    )
     parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode")
     parser.add_argument(
         "-s", "--single", action="store_true", help="Enable single-threaded mode"
     )
+    parser.add_argument(
+        "--durability",
+        choices=DURABILITY_MODES,
+        default=DURABILITY_SYNC,
+        help="When written data is fsynced: after every write (sync), on "
+        "flush/release/fsync (close-to-open), or buffered per open file (writeback)",
+    )
+    parser.add_argument(
+        "--writeback_buffer",
+        type=int,
+        default=MAX_WRITEBACK_BUFFER,
+        help="Max buffered bytes per open file in writeback mode",
+    )
+    parser.add_argument(
+        "--metadata_flush_interval",
+        type=float,
+        default=METADATA_FLUSH_INTERVAL,
+        help="Seconds between background flushes of deferred write metadata to Redis",
+    )
+    parser.add_argument(
+        "--attr_ttl",
+        type=float,
+        default=ATTR_TTL,
+        help="Seconds getattr results are cached in memory (0 disables)",
+    )
+    parser.add_argument(
+        "--negative_ttl",
+        type=float,
+        default=NEGATIVE_TTL,
+        help="Seconds a missing path is remembered by getattr (0 disables)",
+    )
+    parser.add_argument(
+        "--readahead_max",
+        type=int,
+        default=READAHEAD_MAX,
+        help="Largest read-ahead window in bytes for sequential remote reads (0 disables)",
+    )
+    parser.add_argument(
+        "--remote_block_size",
+        type=int,
+        default=REMOTE_BLOCK_SIZE,
+        help="Remote reads are fetched and cached in aligned blocks of this many bytes",
+    )
+    parser.add_argument(
+        "--replication_factor",
+        type=int,
+        default=REPLICATION_FACTOR,
+        help="Copies kept of each written file, including the writer's "
+        "(per-directory overrides live in the Redis hash `replication`)",
+    )
+    parser.add_argument(
+        "--manifest_path",
+        default=None,
+        help="File recording the last startup scan, so restarts only publish changes "
+        "(default: under $MULTICLOUD_FS_STATE_DIR)",
+    )
+    parser.add_argument(
+        "--heartbeat_interval",
+        type=float,
+        default=HEARTBEAT_INTERVAL,
+        help="Seconds between refreshes of this node's heartbeat key in Redis",
+    )
+    parser.add_argument(
+        "--heartbeat_ttl",
+        type=float,
+        default=HEARTBEAT_TTL,
+        help="Seconds without a heartbeat after which a peer is treated as dead",
+    )
+    parser.add_argument(
+        "--zone",
+        default=os.environ.get("MULTICLOUD_FS_ZONE"),
+        help="Topology label of this node (e.g. cloud region); replicas in the same "
+        "zone are preferred when peers perform alike",
+    )
 
     args = parser.parse_args()
 
@@ -50,27 +152,58 @@ def parse_args():
 
 def run():
     args = parse_args()
-    redis_client = RedisClient(url=args.redis_url)
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+    redis_client = RedisClient(
+        url=args.redis_url,
+        cluster=args.redis_cluster,
+        inode_encoding=args.inode_encoding,
+        near_cache_bytes=args.near_cache_size,
+    )
+    redis_client.migrate_dir_index()
+    redis_client.migrate_locations()
+    redis_client.load_scripts()
     client_url = f"{args.host_ip}:{args.port}"
     cache = CacheManager()
-    client_manager = GrpcClientManager(redis_client=redis_client, url=client_url)
+    client_manager = GrpcClientManager(
+        redis_client=redis_client, url=client_url, zone=args.zone
+    )
     threading.Thread(
         target=run_server_process,
         args=(args.root_path, args.port, cache, redis_client, client_url),
         daemon=True,
     ).start()
+    client_manager.start_heartbeat(args.heartbeat_interval, args.heartbeat_ttl)
+    client_manager.start_membership_watch()
     server = MultiCloudFS(
-        dash_s_do="setsingle",
         root_path=args.root_path,
         client=client_manager,
         redis_client=redis_client,
         cache=cache,
+        durability=args.durability,
+        writeback_buffer=args.writeback_buffer,
+        metadata_flush_interval=args.metadata_flush_interval,
+        attr_cache=AttrCache(ttl=args.attr_ttl, negative_ttl=args.negative_ttl),
+        readahead_max=args.readahead_max,
+        remote_block_size=args.remote_block_size,
+        replication_factor=args.replication_factor,
     )
-    client_manager.initialize_files(server.get_files())
+    scanner = Scanner(
+        args.root_path, redis_client, client_url, manifest_path=args.manifest_path
+    )
+    scanner.run()
+
+    def shutdown():
+        # Buffered writes, deferred metadata and running replication must land before our
+        # locations go
+        server.destroy()
+        client_manager.remove_manager()
+        # Our locations are gone from Redis: the next start must publish everything
+        scanner.invalidate()
+        redis_client.close()
 
     def signal_handler(sig, frame):
         print("Shutting down, cleaning up resources...")
-        client_manager.remove_manager(server.get_files())
+        shutdown()
         sys.exit(0)
 
     signal.signal(signal.SIGINT, signal_handler)
@@ -85,4 +218,4 @@ def run():
         fuse_args.append("-s")
     server.parse(errex=1, args=fuse_args)
     server.main()
-    client_manager.remove_manager(server.get_files())
+    shutdown()
@@ -0,0 +1,118 @@
+# cython: language_level=3
+import itertools
+import os
+import threading
+
+# Write durability policies (see MultiCloudFS.write)
+DURABILITY_SYNC = "sync"  # fsync after every write
+DURABILITY_CLOSE_TO_OPEN = "close-to-open"  # fsync on flush/release/fsync only
+DURABILITY_WRITEBACK = "writeback"  # buffer per handle, write out in large extents
+DURABILITY_MODES = (DURABILITY_SYNC, DURABILITY_CLOSE_TO_OPEN, DURABILITY_WRITEBACK)
+MAX_WRITEBACK_BUFFER = 4 * 1024 * 1024  # 4 MB dirty data per handle
+
+_ids = itertools.count(1)
+
+
+class FileHandle:
+    # Returned from MultiCloudFS.open/create and passed back by FUSE as `fh`.
+    # A handle is either local (fd on the backing file) or remote (peer chosen at open).
+    def __init__(
+        self,
+        path: str,
+        flags: int,
+        fd: int | None = None,
+        peer: str | None = None,
+        max_dirty: int = MAX_WRITEBACK_BUFFER,
+    ):
+        self.id = next(_ids)
+        self.path = path
+        self.flags = flags
+        self.fd = fd
+        self.peer = peer
+        self.lock = threading.RLock()
+        self.max_dirty = max_dirty
+        self.unsynced = False  # written since the last fsync
+        # Single coalesced dirty extent [_dirty_off, _dirty_off + len(_dirty))
+        self._dirty = bytearray()
+        self._dirty_off = 0
+
+    @property
+    def is_local(self) -> bool:
+        return self.fd is not None
+
+    @property
+    def has_dirty(self) -> bool:
+        return len(self._dirty) > 0
+
+    @property
+    def dirty_end(self) -> int:
+        return self._dirty_off + len(self._dirty) if self._dirty else 0
+
+    def pread(self, size: int, offset: int) -> bytes:
+        return os.pread(self.fd, size, offset)
+
+    def pwrite(self, buf, offset: int) -> int:
+        n = os.pwrite(self.fd, buf, offset)
+        self.unsynced = True
+        return n
+
+    def buffer_write(self, buf, offset: int) -> int:
+        with self.lock:
+            end = self._dirty_off + len(self._dirty)
+            if self._dirty and not (self._dirty_off <= offset <= end):
+                # Not contiguous with (or inside) the pending extent
+                self.flush_dirty()
+            elif len(self._dirty) >= self.max_dirty:
+                self.flush_dirty()  # a previous write-out failed; retry before growing
+            if not self._dirty:
+                self._dirty_off = offset
+            rel = offset - self._dirty_off
+            self._dirty[rel : rel + len(buf)] = buf
+            if len(self._dirty) >= self.max_dirty:
+                try:
+                    self.flush_dirty()
+                except OSError:
+                    pass  # data stays buffered; the error surfaces on the next flush
+            return len(buf)
+
+    def flush_dirty(self) -> int:
+        with self.lock:
+            if not self._dirty:
+                return 0
+            # Only what reached the file leaves the buffer: on ENOSPC/EIO the unwritten
+            # tail is kept and the error goes to the caller (flush/fsync/release)
+            data, off = bytes(self._dirty), self._dirty_off
+            view = memoryview(data)
+            written = 0
+            try:
+                while written < len(data):
+                    written += self.pwrite(view[written:], off + written)
+            finally:
+                del self._dirty[:written]
+                self._dirty_off = off + written
+            return written
+
+    def sync(self, datasync=False):
+        with self.lock:
+            self.flush_dirty()
+            if self.fd is None or not self.unsynced:
+                return
+            if datasync:
+                os.fdatasync(self.fd)
+            else:
+                os.fsync(self.fd)
+            self.unsynced = False
+
+    def close(self):
+        with self.lock:
+            try:
+                self.flush_dirty()
+            except OSError:
+                pass
+            fd, self.fd = self.fd, None
+            self._dirty.clear()
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
@@ -1,16 +1,60 @@
 # cython: language_level=3
 import errno
+import functools
+import itertools
+import json
 import logging
 import os
 import threading
 import time
+from collections import OrderedDict
 from typing import Any, Dict, Iterable
 
 import fuse
 
+from attr_cache import AttrCache
+from block_fetcher import REMOTE_BLOCK_SIZE, BlockFetcher
 from cache_manager import MAX_MEM_CACHE_FILE_SIZE, CacheManager
+from file_handle import (
+    DURABILITY_SYNC,
+    DURABILITY_WRITEBACK,
+    MAX_WRITEBACK_BUFFER,
+    FileHandle,
+)
 from grpc_client_manager import GrpcClientManager
-from redis_client import RedisClient
+from path_lock import PathLocks, locked
+from readahead import READAHEAD_MAX, ReadAhead
+from redis_client import (
+    REPLICA_LOST_CHANNEL,
+    STAT_FLOAT_FIELDS,
+    STAT_INT_FIELDS,
+    RedisClient,
+)
+from replicator import REPLICATION_FACTOR, Replicator
+
+METADATA_FLUSH_INTERVAL = 1.0  # seconds between background metadata flushes
+MAX_DIRTY_INODES = 10000  # flush early once this many paths are pending
+MAX_DIR_CURSORS = 100000  # readdir resume points kept (offset -> last entry returned)
+STATS_LOG_INTERVAL = 60.0  # seconds between cache/replication counter log lines
+
+
+def invalidates(npaths: int = 1):
+    # Method decorator for mutating ops: drop the cached attrs of the first `npaths` path
+    # arguments (and their parents) before and after the call. Only the op's own paths are
+    # locked, so a getattr of the parent can re-cache old values while it runs.
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            paths = [self._norm(p) for p in args[:npaths]]
+            self._invalidate(*paths)
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                self._invalidate(*paths)
+
+        return wrapper
+
+    return decorator
 
 
 class MultiCloudFS(fuse.Fuse):
@@ -23,6 +67,13 @@ class MultiCloudFS(fuse.Fuse):
         redis_client: RedisClient,
         cache: CacheManager | None = None,
         *args,
+        durability: str = DURABILITY_SYNC,
+        writeback_buffer: int = MAX_WRITEBACK_BUFFER,
+        metadata_flush_interval=METADATA_FLUSH_INTERVAL,
+        attr_cache: AttrCache | None = None,
+        readahead_max: int = READAHEAD_MAX,
+        remote_block_size: int = REMOTE_BLOCK_SIZE,
+        replication_factor: int = REPLICATION_FACTOR,
         **kwargs
     ):
         super().__init__(*args, **kwargs)
@@ -32,32 +83,136 @@ class MultiCloudFS(fuse.Fuse):
         self.logger = logging.getLogger(__name__)
         self.cache = cache if cache else CacheManager()
         self.cache.set_evict_callback(self._on_cache_evict)
+        self.attr_cache = attr_cache if attr_cache else AttrCache()
+        self.blocks = BlockFetcher(
+            self._read_remote_range,
+            self.cache,
+            block_size=remote_block_size,
+            replicas=self.client.remotes,
+        )
+        self.readahead = ReadAhead(self._fetch_remote, max_window=readahead_max)
+        self.replicator = Replicator(
+            self.client, self.redis_client, self.root_path, factor=replication_factor
+        )
+        self.durability = durability
+        self.writeback_buffer = writeback_buffer
+        self.metadata_flush_interval = metadata_flush_interval
+        self.locks = PathLocks()
         self._written_once: set[str] = set()
+        self._written_lock = threading.Lock()
+        self._handles: dict[int, FileHandle] = {}
+        self._handles_lock = threading.Lock()
         self._stop = False
         self._log_lock = threading.Lock()
-        self._op_log: list[tuple[str, tuple]] = []
+        # readdir offsets handed to FUSE -> (dir path, entry name) to resume after
+        self._dir_cursors: "OrderedDict[int, tuple[str, str]]" = OrderedDict()
+        self._dir_offsets = itertools.count(3)  # 1 and 2 are "." and ".."
+        self._cursor_lock = threading.Lock()
+        # Dirty-inode table: path -> pending Redis update, merged until flushed
+        self._op_log: dict[str, dict] = {}
         self._flusher_thread = threading.Thread(
             target=self._flush_log_periodically, daemon=True
         )
         self._flusher_thread.start()
+        self._replica_lost_thread = None
+        try:
+            self._replica_lost_thread = self.redis_client.subscribe(
+                REPLICA_LOST_CHANNEL, self._on_replica_lost
+            )
+        except Exception as e:
+            self.logger.warning("Cannot subscribe to %s: %s", REPLICA_LOST_CHANNEL, e)
 
     # ------------- helpers -------------
-    def _flush_log_periodically(self):  # stub – can be extended to persist batched ops
+    def _flush_log_periodically(self):
+        next_stats = time.monotonic() + STATS_LOG_INTERVAL
         while not self._stop:
-            time.sleep(5)
-            with self._log_lock:
-                self._op_log.clear()
+            time.sleep(self.metadata_flush_interval)
+            self._flush_log()
+            if time.monotonic() >= next_stats:
+                next_stats = time.monotonic() + STATS_LOG_INTERVAL
+                try:
+                    self.logger.info("stats: %s", self.stats())
+                except Exception:
+                    pass
 
-    def _log_op(self, op: str, *args):  # lightweight in‑memory log (extensible)
+    def _log_op(self, op: str, path: str, *args):
+        # Record a deferred metadata update; repeated updates to a path collapse into one entry.
+        #   "setattr" (meta)  -> latest metadata wins
+        #   "link"            -> ensure the entry is listed in its parent dir
+        #   "location"        -> ensure this node is in the path's locations
+        full = False
+        with self._log_lock:
+            entry = self._op_log.setdefault(
+                path, {"meta": None, "dir": None, "location": False}
+            )
+            if op == "setattr":
+                entry["meta"] = args[0]
+            elif op == "link":
+                entry["dir"] = (self._parent(path), os.path.basename(path))
+            elif op == "location":
+                entry["location"] = True
+            full = len(self._op_log) >= MAX_DIRTY_INODES
+        if full:
+            self._flush_log()
+
+    def _discard_log(self, path: str):
+        with self._log_lock:
+            self._op_log.pop(path, None)
+            prefix = path.rstrip("/") + "/"
+            for p in [p for p in self._op_log if p.startswith(prefix)]:
+                del self._op_log[p]
+
+    def _drop_logged_meta(self, path: str):
+        # A truncate publishes the inode at once; a deferred setattr from an earlier
+        # write is older and, flushed later, would restore the pre-truncate size
+        with self._log_lock:
+            entry = self._op_log.get(path)
+            if entry is not None:
+                entry["meta"] = None
+
+    def _flush_log(self, path: str | None = None):
+        # Push pending updates (all, or just `path`) to Redis in one pipeline
+        with self._log_lock:
+            if path is None:
+                pending, self._op_log = self._op_log, {}
+            elif path in self._op_log:
+                pending = {path: self._op_log.pop(path)}
+            else:
+                return
+        if not pending:
+            return
         try:
+            self.redis_client.apply_inode_updates(pending, self.client.url)
+        except Exception as e:
+            self.logger.warning("Deferred metadata flush failed: %s", e)
             with self._log_lock:
-                if len(self._op_log) < 1000:
-                    self._op_log.append((op, args))
-        except Exception:
-            pass
+                for p, entry in pending.items():
+                    # Keep newer updates logged meanwhile, requeue the rest
+                    self._op_log.setdefault(p, entry)
 
-    def destroy(self, path=None):  # FUSE lifecycle hook
+    def destroy(self, path=None):  # FUSE lifecycle hook; also run on SIGINT/SIGTERM
+        if self._stop:
+            return
         self._stop = True
+        with self._handles_lock:
+            handles = list(self._handles.values())
+            self._handles.clear()
+        for fh in handles:
+            # Files still open at unmount never see release: write back and fsync now
+            try:
+                fh.sync()
+            except Exception as e:
+                self.logger.warning("Syncing %s on shutdown failed: %s", fh.path, e)
+            fh.close()
+        self._flush_log()
+        # Replicate them against the flushed inodes, and wait for jobs already running
+        for fh in handles:
+            self.replicator.schedule(fh.path)
+        self.readahead.shutdown()
+        self.blocks.shutdown()
+        self.replicator.close()
+        if self._replica_lost_thread is not None:
+            self._replica_lost_thread.stop()
 
     def _norm(self, path: str) -> str:
         if not path:
@@ -107,6 +262,96 @@ class MultiCloudFS(fuse.Fuse):
             "is_dir": (remote.st_mode & 0o170000) == 0o040000,
         }
 
+    # ------------- file handles -------------
+    def _new_handle(
+        self, path: str, flags: int, fd: int | None = None, peer: str | None = None
+    ) -> FileHandle:
+        fh = FileHandle(path, flags, fd=fd, peer=peer, max_dirty=self.writeback_buffer)
+        with self._handles_lock:
+            self._handles[fh.id] = fh
+        return fh
+
+    def _drop_handle(self, fh: FileHandle):
+        with self._handles_lock:
+            self._handles.pop(fh.id, None)
+        fh.close()
+
+    def _flush_dirty_handles(self, path: str):
+        # Make buffered (writeback) data visible to path-based ops such as stat/truncate
+        if self.durability != DURABILITY_WRITEBACK:
+            return
+        with self._handles_lock:
+            handles = [fh for fh in self._handles.values() if fh.path == path]
+        for fh in handles:
+            fh.flush_dirty()
+
+    def _rename_handles(self, old_path: str, new_path: str):
+        with self._handles_lock:
+            for fh in self._handles.values():
+                if fh.path == old_path:
+                    fh.path = new_path
+                elif fh.path.startswith(old_path + "/"):
+                    fh.path = new_path + fh.path[len(old_path) :]
+
+    def _local_fd(self, path: str, fh, flags: int):
+        # -> (fd, owned); owned fds were opened for this call only and must be closed
+        if isinstance(fh, FileHandle) and fh.fd is not None:
+            return fh.fd, False
+        full = self._full_path(path)
+        if not os.path.exists(full):
+            return None, False
+        return os.open(full, flags), True
+
+    def _on_replica_lost(self, data: str):
+        # A peer left: stop pinning handles to it and re-replicate the files we hold
+        msg = json.loads(data)
+        host = msg.get("host")
+        if host == self.client.url:
+            return
+        with self._handles_lock:
+            for fh in self._handles.values():
+                if fh.peer == host:
+                    fh.peer = None
+        held = [p for p in msg.get("paths", []) if os.path.isfile(self._full_path(p))]
+        try:
+            locations = self.redis_client.get_locations_many(held)
+        except Exception:
+            locations = {}
+        me = self.client.url
+        for path in held:
+            # Every holder gets the message; only the first live one by URL re-replicates,
+            # the others would each place copies and overshoot the replication factor
+            locs = locations.get(self._norm(path), [me])
+            holders = [a for a in locs if a == me or self.client.usable(a)]
+            if holders and min(holders) != me:
+                continue
+            self.replicator.mark_dirty(path, 0, 0)
+            self.replicator.schedule(path)
+
+    def _invalidate(self, *paths):
+        # Drop cached attrs of the given paths and their parents (nlink/mtime change)
+        targets = set()
+        for p in paths:
+            targets.add(p)
+            targets.add(self._parent(p))
+            self.blocks.forget(p)  # the file end learnt from remote reads may move
+        self.attr_cache.invalidate(*targets)
+
+    def _put_remote_attr(self, path: str, attr):
+        self.attr_cache.put(path, attr)
+        self.blocks.observe_size(path, attr.st_size)
+
+    def stats(self):
+        return {
+            "attr_cache": self.attr_cache.stats(),
+            "cache": self.cache.stats(),
+            "replication_pending": self.replicator.pending(),
+            "near_cache": self.redis_client.near_cache_stats(),
+        }
+
+    def _stat_from_metadata(self, meta: Dict[str, Any]) -> fuse.Stat:
+        return fuse.Stat(**{k: meta[k] for k in STAT_INT_FIELDS + STAT_FLOAT_FIELDS})
+
     def _register_cache_location(self, path: str):
         try:
             locs = self.redis_client.get_locations(path)
@@ -122,95 +367,149 @@ class MultiCloudFS(fuse.Fuse):
         except Exception:
             pass
 
-    # ------------- initial scan (optional use) -------------
-    def get_files(self) -> list[str]:
-        files: list[str] = []
-        for dirpath, dirnames, filenames in os.walk(self.root_path):
-            rel_dir = self._norm(dirpath.replace(self.root_path, ""))
-            try:
-                st = os.lstat(dirpath)
-                self.redis_client.set_metadata(
-                    rel_dir, self._build_local_metadata(rel_dir, st)
-                )
-            except Exception:
-                pass
-            for n in dirnames + filenames:
-                try:
-                    self.redis_client.add_to_dir(rel_dir, n)
-                except Exception:
-                    pass
-            for f in filenames:
-                fp = os.path.join(dirpath, f)
-                rel_file = self._norm(fp.replace(self.root_path, ""))
-                try:
-                    stf = os.lstat(fp)
-                    self.redis_client.set_metadata(
-                        rel_file, self._build_local_metadata(rel_file, stf)
-                    )
-                    self.redis_client.add_location(rel_file, self.client.url)
-                    files.append(rel_file)
-                except Exception:
-                    pass
-        return files
-
     # ------------- core ops -------------
+    @locked(exclusive=False)
     def getattr(self, path: str):
         path = self._norm(path)
         full = self._full_path(path)
+        hit, attr = self.attr_cache.lookup(path)
+        if hit:
+            return attr if attr is not None else -errno.ENOENT
         # Local first
         try:
             if os.path.exists(full):
+                self._flush_dirty_handles(path)
                 st = os.lstat(full)
-                self.redis_client.set_metadata(
-                    path, self._build_local_metadata(path, st)
-                )
+                # Refresh Redis lazily; the attr cache keeps this to once per TTL
+                self._log_op("setattr", path, self._build_local_metadata(path, st))
+                self.attr_cache.put(path, st)
                 return st
         except Exception:
             return -errno.EIO
-        # Remote
+        # Remote: the inode hash already holds the owner's stat data
+        try:
+            meta = self.redis_client.get_stat(path)
+            if meta and (meta["is_dir"] or meta["locations"]):
+                attr = self._stat_from_metadata(meta)
+                self._put_remote_attr(path, attr)
+                return attr
+        except Exception:
+            pass
+        # Missing or orphaned metadata: verify with a peer holding the file
         try:
             attr = self.client.getattr(path)
-            if attr:
+            if attr and attr.st_mode:
                 self.redis_client.set_metadata(path, self._build_remote_metadata(attr))
+                self._put_remote_attr(path, attr)
                 return attr
         except Exception:
             pass
+        self.attr_cache.put_negative(path)
         return -errno.ENOENT
 
-    def readdir(self, path: str, offset: int) -> Iterable[fuse.Direntry]:
+    def readdir(self, path: str, offset: int):
+        # Offsets: "." is 1, ".." is 2 and every other entry gets a cursor naming it, so
+        # FUSE can resume a listing after the last entry it took (buffer full), even if
+        # entries were created or removed in between.
         path = self._norm(path)
-        yield fuse.Direntry(".")
-        yield fuse.Direntry("..")
+        after = None
+        if offset > 2:
+            with self._cursor_lock:
+                cursor = self._dir_cursors.get(offset)
+            if cursor is None or cursor[0] != path:
+                # Evicted or foreign cursor: fail instead of ending the listing early
+                self.logger.warning("readdir %s: unknown offset %d", path, offset)
+                return -errno.EINVAL
+            after = cursor[1]
+        return self._iter_dir(path, offset, after)
+
+    def _iter_dir(
+        self, path: str, offset: int, after: str | None
+    ) -> Iterable[fuse.Direntry]:
+        if offset < 1:
+            yield fuse.Direntry(".", offset=1)
+        if offset < 2:
+            yield fuse.Direntry("..", offset=2)
+        base = "" if path == "/" else path
+        # Entries' attributes come with the listing and prefill the getattr cache (ls -l).
+        # Local entries are skipped: getattr lstat()s them, which is fresher than Redis.
+        local = self._local_names(path)
+        listed = False
         try:
-            entries = self.redis_client.get_dir(path) or []
-        except Exception:
-            entries = []
-        for raw in sorted(entries):
-            try:
-                name = raw.decode() if isinstance(raw, (bytes, bytearray)) else str(raw)
-                if name and name not in (".", ".."):
-                    yield fuse.Direntry(name)
-            except Exception:
-                continue
+            for name, meta in self.redis_client.iter_dir_plus(path, after):
+                listed = True
+                if not name or name in (".", ".."):
+                    continue
+                if name not in local and meta and (meta["is_dir"] or meta["locations"]):
+                    self._put_remote_attr(
+                        base + "/" + name, self._stat_from_metadata(meta)
+                    )
+                yield fuse.Direntry(name, offset=self._dir_cursor(path, name))
+        except Exception as e:
+            if listed:
+                return
+            # Redis unavailable: list the local disk and the peers instead
+            self.logger.warning(
+                "readdir %s from Redis failed (%s), asking peers", path, e
+            )
+            for name, attr in self._list_without_redis(path, local):
+                if after is not None and name <= after:
+                    continue
+                if attr is not None and attr.st_mode:
+                    self._put_remote_attr(base + "/" + name, attr)
+                yield fuse.Direntry(name, offset=self._dir_cursor(path, name))
+
+    def _dir_cursor(self, path: str, name: str) -> int:
+        with self._cursor_lock:
+            offset = next(self._dir_offsets)
+            self._dir_cursors[offset] = (path, name)
+            while len(self._dir_cursors) > MAX_DIR_CURSORS:
+                self._dir_cursors.popitem(last=False)
+        return offset
+
+    def _local_names(self, path: str) -> set:
+        try:
+            return set(os.listdir(self._full_path(path)))
+        except OSError:
+            return set()
 
-    def read(self, path: str, size: int, offset: int):
+    def _list_without_redis(self, path: str, local: set) -> list:
+        # -> sorted [(name, peer attr or None for local entries)]
+        entries = {}
+        try:
+            entries.update(self.client.readdir_plus(path))
+        except Exception:
+            pass
+        for name in local:
+            entries[name] = None
+        entries.pop(".", None)
+        entries.pop("..", None)
+        return sorted(entries.items())
+
+    @locked(exclusive=False)
+    def read(self, path: str, size: int, offset: int, fh=None):
         # Cache
         path = self._norm(path)
-        full = self._full_path(path)
         try:
             c = self.cache.get(path, offset, size)
             if c is not None:
                 # Do not advertise location based on partial cache slices
+                if isinstance(fh, FileHandle) and not fh.is_local:
+                    # Keep the read-ahead window moving while hits are served from it
+                    self.readahead.on_read(path, offset, size, fh.peer)
                 return c
         except Exception:
             pass
         # Local
         try:
-            if os.path.exists(full):
-                with open(full, "rb") as f:
-                    if offset:
-                        f.seek(offset)
-                    data = f.read(size)
+            fd, owned = self._local_fd(path, fh, os.O_RDONLY)
+            if fd is not None:
+                self._flush_dirty_handles(path)
+                try:
+                    data = os.pread(fd, size, offset)
+                finally:
+                    if owned:
+                        os.close(fd)
                 # Always persist what we read into cache (disk-backed; mem limited inside)
                 try:
                     if data:
@@ -223,99 +522,128 @@ class MultiCloudFS(fuse.Fuse):
         except Exception:
             pass
         # Remote
+        peer = fh.peer if isinstance(fh, FileHandle) else None
         try:
-            # Prefer streaming for large reads
-            stream = self.client.read_stream(path, size, offset)
-            if stream is not None:
-                parts = []
-                total = 0
-                cur_off = offset
-                for chunk in stream:
-                    if not chunk:
-                        break
-                    # Respect requested size if provided
-                    part = chunk if size <= 0 else chunk[: max(0, size - total)]
-                    if not part:
-                        break
-                    parts.append(part)
-                    try:
-                        self.cache.put(path, part, cur_off)
-                        # Do not register location yet; may be partial
-                    except Exception:
-                        pass
-                    cur_off += len(part)
-                    total += len(part)
-                    if size > 0 and total >= size:
-                        break
-                if parts:
-                    return b"".join(parts)
-            # Fallback to unary read
-            part = self.client.read(path, size, offset)
-            if part is not None:
-                try:
-                    if part:
-                        self.cache.put(path, part, offset)
-                        # Do not register location on partial cache
-                except Exception:
-                    pass
-                return part
+            data = self._fetch_remote(path, size, offset, peer)
         except Exception:
-            pass
-        return -errno.ENOENT
+            data = None
+        if data is None:
+            return -errno.ENOENT
+        self.readahead.on_read(path, offset, size, peer)
+        return data
+
+    def _fetch_remote(self, path: str, size: int, offset: int, peer=None):
+        # Read a range from a peer through block-aligned, cached, single-flight fetches;
+        # None when no peer has the file
+        return self.blocks.read(path, size, offset, peer)
+
+    def _read_remote_range(self, path: str, size: int, offset: int, peer=None):
+        # Streamed read; None on failure so BlockFetcher never mistakes an error for EOF
+        return self.client.read_range(path, size, offset, addr=peer)
 
-    def write(self, path: str, buf: bytes, offset: int):
+    @locked()
+    @invalidates()
+    def write(self, path: str, buf: bytes, offset: int, fh=None):
         path = self._norm(path)
         full = self._full_path(path)
         try:
-            os.makedirs(os.path.dirname(full), exist_ok=True)
-            exists = os.path.exists(full)
-            mode = "r+b" if exists else "wb"
-            with open(full, mode) as f:
-                if offset > 0:
-                    f.seek(offset)
-                n = f.write(buf)
-                f.flush()
-                os.fsync(f.fileno())
-            st = os.lstat(full)
-            self.redis_client.set_metadata(path, self._build_local_metadata(path, st))
-            try:
-                self.redis_client.add_to_dir(self._parent(path), os.path.basename(path))
-            except Exception:
-                pass
+            local = isinstance(fh, FileHandle) and fh.fd is not None
+            if not local and not os.path.exists(full):
+                # Held by peers only: never start a local file with just these bytes
+                n = self._write_remote(path, buf, offset, fh)
+                if n is not None:
+                    return n
+            fd, owned = self._local_fd(path, fh, os.O_WRONLY)
+            if fd is None:
+                os.makedirs(os.path.dirname(full), exist_ok=True)
+                fd, owned = os.open(full, os.O_WRONLY | os.O_CREAT, 0o644), True
             try:
-                self.redis_client.add_location(path, self.client.url)
-            except Exception:
-                pass
+                if owned or self.durability == DURABILITY_SYNC:
+                    # No handle to defer to: behave like "sync"
+                    n = os.pwrite(fd, buf, offset)
+                    os.fsync(fd)
+                elif self.durability == DURABILITY_WRITEBACK:
+                    n = fh.buffer_write(buf, offset)
+                else:
+                    n = fh.pwrite(buf, offset)
+                st = os.fstat(fd)
+            finally:
+                if owned:
+                    os.close(fd)
+            meta = self._build_local_metadata(path, st)
+            if isinstance(fh, FileHandle) and fh.has_dirty:
+                meta["st_size"] = max(st.st_size, fh.dirty_end)
+            # Metadata, dir entry and location are coalesced and published on
+            # release/fsync or by the background flusher
+            self._log_op("setattr", path, meta)
+            self._log_op("link", path)
+            self._log_op("location", path)
             # Update cache with the exact written range; CacheManager handles memory/disk limits
             try:
                 if buf:
                     self.cache.put(path, buf, offset)
-                    # Register cache location because data is persisted locally
-                    self._register_cache_location(path)
-            except Exception:
-                pass
-            self._written_once.add(path)
-            try:
-                self.client.write(path, buf, offset)
             except Exception:
                 pass
+            with self._written_lock:
+                self._written_once.add(path)
+            # Shipped to replicas in the background once the file is closed
+            self.replicator.mark_dirty(path, offset, n)
             return n
         except PermissionError:
             return -errno.EACCES
         except Exception:
             return -errno.EIO
 
+    def _write_remote(self, path: str, buf, offset: int, fh=None):
+        # Forward a write to the holder of a file this node has no copy of (the handle's
+        # peer). -> bytes written, -EIO, or None when no peer holds the file (new file).
+        peer = fh.peer if isinstance(fh, FileHandle) else None
+        peer = peer or self.client.pick_remote(path)
+        if not peer:
+            return None
+        n = self.client.write(path, buf, offset, addr=peer)
+        if n is None or n < 0:
+            return -errno.EIO
+        if isinstance(fh, FileHandle):
+            fh.peer = peer
+        try:
+            # Other copies (replicas, caches) no longer match the holder's: stop advertising
+            for addr in self.redis_client.get_locations(path):
+                if addr != peer:
+                    self.redis_client.remove_location(path, addr)
+            meta = self.redis_client.get_stat(path)
+            if meta:
+                meta = {k: meta[k] for k in STAT_INT_FIELDS + STAT_FLOAT_FIELDS}
+                meta["st_size"] = max(meta["st_size"], offset + n)
+                meta["st_mtime"] = meta["st_ctime"] = time.time()
+                meta["is_dir"] = False
+                self._log_op("setattr", path, meta)
+        except Exception:
+            pass
+        try:
+            self.cache.remove(path)
+        except Exception:
+            pass
+        self.blocks.forget(path)
+        return n
+
+    @locked()
+    @invalidates()
     def truncate(self, path: str, size: int):
         path = self._norm(path)
         full = self._full_path(path)
         try:
             if os.path.exists(full):
+                self._flush_dirty_handles(path)
                 with open(full, "r+b") as f:
                     f.truncate(size)
                 st = os.lstat(full)
+                self._drop_logged_meta(path)
                 self.redis_client.set_metadata(
                     path, self._build_local_metadata(path, st)
                 )
+                self.replicator.mark_dirty(path, size, 0)
+                self.replicator.schedule(path)
                 return 0
         except Exception:
             return -errno.EIO
@@ -332,6 +660,8 @@ class MultiCloudFS(fuse.Fuse):
             pass
         return -errno.ENOENT
 
+    @locked()
+    @invalidates()
     def unlink(self, path: str):
         path = self._norm(path)
         full = self._full_path(path)
@@ -339,7 +669,10 @@ class MultiCloudFS(fuse.Fuse):
             self.cache.remove(path)
         except Exception:
             pass
-        self._written_once.discard(path)
+        self._discard_log(path)
+        self.replicator.forget(path)
+        with self._written_lock:
+            self._written_once.discard(path)
         if os.path.exists(full):
             try:
                 os.unlink(full)
@@ -347,10 +680,6 @@ class MultiCloudFS(fuse.Fuse):
                 return -e.errno
             except Exception:
                 return -errno.EIO
-            try:
-                self.redis_client.remove_location(path, self.client.url)
-            except Exception:
-                pass
         else:
             # remote deletion
             try:
@@ -358,23 +687,21 @@ class MultiCloudFS(fuse.Fuse):
                     return -errno.ENOENT
             except Exception:
                 return -errno.EIO
-        remaining = []
+        # Drop our location; the inode and dir entry go once no copy is left
         try:
-            remaining = self.redis_client.get_locations(path)
+            self.redis_client.unlink_path(path, self.client.url)
         except Exception:
             pass
-        if not remaining:
-            try:
-                parent = self._parent(path)
-                self.redis_client.remove_metadata(path)
-                self.redis_client.remove_from_dir(parent, os.path.basename(path))
-            except Exception:
-                pass
         return 0
 
+    @locked()
+    @invalidates()
     def rmdir(self, path: str):
         path = self._norm(path)
+        self.attr_cache.invalidate_prefix(path)
         full = self._full_path(path)
+        self._discard_log(path)
+        self.replicator.forget(path)
         if os.path.exists(full):
             try:
                 os.rmdir(full)
@@ -383,12 +710,7 @@ class MultiCloudFS(fuse.Fuse):
             except Exception:
                 return -errno.EIO
             try:
-                self.redis_client.remove_metadata(path)
-                self.redis_client.remove_from_dir(
-                    self._parent(path), os.path.basename(path)
-                )
-                self.redis_client.remove_dir(path)
-                self.redis_client.remove_location(path, self.client.url)
+                self.redis_client.rmdir_path(path, self.client.url)
             except Exception:
                 pass
             return 0
@@ -400,6 +722,8 @@ class MultiCloudFS(fuse.Fuse):
             return -errno.EIO
         return -errno.ENOENT
 
+    @locked()
+    @invalidates()
     def mkdir(self, path: str, mode: int):
         path = self._norm(path)
         full = self._full_path(path)
@@ -409,15 +733,9 @@ class MultiCloudFS(fuse.Fuse):
                 os.makedirs(full, exist_ok=True)
                 os.chmod(full, mode)
             st = os.lstat(full)
-            self.redis_client.set_metadata(path, self._build_local_metadata(path, st))
-            try:
-                self.redis_client.add_to_dir(parent, os.path.basename(path))
-            except Exception:
-                pass
-            try:
-                self.redis_client.add_location(path, self.client.url)
-            except Exception:
-                pass
+            self.redis_client.make_dir(
+                path, self._build_local_metadata(path, st), self.client.url
+            )
             return 0
         except Exception:
             # remote attempt
@@ -428,6 +746,8 @@ class MultiCloudFS(fuse.Fuse):
                 pass
             return -errno.EIO
 
+    @locked()
+    @invalidates()
     def create(self, path: str, flags: int, mode: int):  # FUSE create (file)
         path = self._norm(path)
         full = self._full_path(path)
@@ -435,18 +755,13 @@ class MultiCloudFS(fuse.Fuse):
         try:
             os.makedirs(os.path.dirname(full), exist_ok=True)
             fd = os.open(full, flags, mode)
-            os.close(fd)
-            st = os.lstat(full)
-            self.redis_client.set_metadata(path, self._build_local_metadata(path, st))
-            try:
-                self.redis_client.add_to_dir(parent, os.path.basename(path))
-            except Exception:
-                pass
-            try:
-                self.redis_client.add_location(path, self.client.url)
-            except Exception:
-                pass
-            return 0
+            fh = self._new_handle(path, flags, fd=fd)
+            self.replicator.mark_dirty(path, 0, 0)
+            st = os.fstat(fd)
+            self.redis_client.create_file(
+                path, self._build_local_metadata(path, st), self.client.url
+            )
+            return fh
         except FileExistsError:
             return -errno.EEXIST
         except PermissionError:
@@ -455,54 +770,39 @@ class MultiCloudFS(fuse.Fuse):
             # remote
             try:
                 if self.client.create(path, parent, flags, mode):
-                    return 0
+                    return self._new_handle(
+                        path, flags, peer=self.client.pick_remote(path)
+                    )
             except Exception:
                 pass
             return -errno.EIO
 
+    @locked(npaths=2)
+    @invalidates(npaths=2)
     def rename(self, old_path: str, new_path: str):
         old_path = self._norm(old_path)
         new_path = self._norm(new_path)
+        self.attr_cache.invalidate_prefix(old_path)
+        self.attr_cache.invalidate_prefix(new_path)
         full_old = self._full_path(old_path)
         full_new = self._full_path(new_path)
+        # Publish pending updates (old path and any descendants) before moving metadata
+        self._flush_log()
         self.cache.rename(old_path, new_path)
         try:
             if os.path.exists(full_old):
                 os.makedirs(os.path.dirname(full_new), exist_ok=True)
                 os.rename(full_old, full_new)
-                meta = self.redis_client.get_metadata(old_path)
-                if meta:
-                    decoded = {
-                        (k.decode() if isinstance(k, (bytes, bytearray)) else k): (
-                            v.decode() if isinstance(v, (bytes, bytearray)) else v
-                        )
-                        for k, v in meta.items()
-                    }
-                    self.redis_client.set_metadata(new_path, decoded)
-                    self.redis_client.remove_metadata(old_path)
-                try:
-                    self.redis_client.remove_location(old_path, self.client.url)
-                    self.redis_client.add_location(new_path, self.client.url)
-                except Exception:
-                    pass
-                p_old = self._parent(old_path)
-                p_new = self._parent(new_path)
                 try:
-                    if p_old != p_new:
-                        self.redis_client.remove_from_dir(
-                            p_old, os.path.basename(old_path)
-                        )
-                        self.redis_client.add_to_dir(p_new, os.path.basename(new_path))
-                    else:
-                        self.redis_client.add_to_dir(p_old, os.path.basename(new_path))
-                        self.redis_client.remove_from_dir(
-                            p_old, os.path.basename(old_path)
-                        )
-                except Exception:
-                    pass
-                if old_path in self._written_once:
-                    self._written_once.discard(old_path)
-                    self._written_once.add(new_path)
+                    self.redis_client.rename_path(old_path, new_path, self.client.url)
+                except Exception as e:
+                    self.logger.warning("Rename metadata update failed: %s", e)
+                with self._written_lock:
+                    if old_path in self._written_once:
+                        self._written_once.discard(old_path)
+                        self._written_once.add(new_path)
+                self._rename_handles(old_path, new_path)
+                self.replicator.rename(old_path, new_path)
                 return 0
         except Exception:
             return -errno.EIO
@@ -515,6 +815,8 @@ class MultiCloudFS(fuse.Fuse):
         return -errno.ENOENT
 
     # ------------- attribute modifications -------------
+    @locked()
+    @invalidates()
     def utime(self, path: str, times):
         path = self._norm(path)
         full = self._full_path(path)
@@ -543,6 +845,8 @@ class MultiCloudFS(fuse.Fuse):
             )
         return self.utime(path, times)
 
+    @locked()
+    @invalidates()
     def chown(self, path: str, uid: int, gid: int):
         path = self._norm(path)
         full = self._full_path(path)
@@ -566,6 +870,8 @@ class MultiCloudFS(fuse.Fuse):
             return -errno.EIO
         return -errno.ENOENT
 
+    @locked()
+    @invalidates()
     def chmod(self, path: str, mode: int):
         path = self._norm(path)
         full = self._full_path(path)
@@ -590,56 +896,69 @@ class MultiCloudFS(fuse.Fuse):
         return -errno.ENOENT
 
     # ------------- misc / FUSE hooks -------------
+    @locked(exclusive=False)
     def open(self, path: str, flags: int):
         path = self._norm(path)
         full = self._full_path(path)
         try:
             if os.path.exists(full):
-                fd = os.open(full, flags)
-                os.close(fd)
-                return 0
+                fd = os.open(full, flags & ~(os.O_CREAT | os.O_EXCL))
+                return self._new_handle(path, flags, fd=fd)
         except PermissionError:
             return -errno.EACCES
         except Exception:
             return -errno.EIO
-        # remote existence check
+        # remote existence check; the handle keeps the chosen peer for its reads
         try:
-            if self.client.getattr(path):
-                return 0
+            peer = self.client.pick_remote(path)
+            if peer and self.client.getattr(path, addr=peer):
+                return self._new_handle(path, flags, peer=peer)
         except Exception:
             pass
         return -errno.ENOENT
 
-    def release(self, path, fh=None):
-        return 0
+    def release(self, path, flags, fh=None):
+        if not isinstance(fh, FileHandle):
+            return 0
+        path = self._norm(path)
+        try:
+            fh.sync()
+            self._flush_log(path)
+            return 0
+        except OSError as e:
+            return -(e.errno or errno.EIO)
+        except Exception:
+            return -errno.EIO
+        finally:
+            self._drop_handle(fh)
+            self.readahead.forget(path)
+            self.blocks.forget(path)
+            self.replicator.schedule(path)
 
     def fsync(self, path, datasync, fh=None):
-        path = self._norm(path)
-        full = self._full_path(path)
-        if not os.path.exists(full) or fh is None:
+        self._flush_log(self._norm(path))
+        if not isinstance(fh, FileHandle) or fh.fd is None:
             return 0
         try:
-            if datasync:
-                os.fdatasync(fh)
-            else:
-                os.fsync(fh)
+            fh.sync(datasync)
             return 0
+        except OSError as e:
+            return -(e.errno or errno.EIO)
         except Exception:
             return -errno.EIO
 
     def flush(self, path, fh=None):
-        path = self._norm(path)
-        full = self._full_path(path)
-        if not os.path.exists(full):
+        if not isinstance(fh, FileHandle) or fh.fd is None:
             return 0
         try:
-            with open(full, "r+b") as f:
-                f.flush()
-                os.fsync(f.fileno())
+            fh.sync()
             return 0
+        except OSError as e:
+            return -(e.errno or errno.EIO)
         except Exception:
             return -errno.EIO
 
+    @locked(exclusive=False)
     def access(self, path, mode):
         path = self._norm(path)
         full = self._full_path(path)
@@ -661,5 +980,29 @@ class MultiCloudFS(fuse.Fuse):
         except Exception:
             return {}
 
-    def fgetattr(self, path, fh=None):  # compatibility wrapper
+    @locked(exclusive=False)
+    def fgetattr(self, path, fh=None):
+        if isinstance(fh, FileHandle) and fh.fd is not None:
+            try:
+                fh.flush_dirty()
+                return os.fstat(fh.fd)
+            except Exception:
+                pass
         return self.getattr(path)
+
+    @locked()
+    @invalidates()
+    def ftruncate(self, path, size, fh=None):
+        if not isinstance(fh, FileHandle) or fh.fd is None:
+            return self.truncate(path, size)
+        path = self._norm(path)
+        try:
+            fh.flush_dirty()
+            os.ftruncate(fh.fd, size)
+            st = os.fstat(fh.fd)
+            self._drop_logged_meta(path)
+            self.redis_client.set_metadata(path, self._build_local_metadata(path, st))
+            self.replicator.mark_dirty(path, size, 0)
+            return 0
+        except Exception:
+            return -errno.EIO
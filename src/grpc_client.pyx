@@ -1,9 +1,13 @@
 import logging
+import threading
+import time
+from collections import deque
 
 import grpc
 
 from multicloud_fs_pb2 import (
     AccessRequest,
+    BatchPathRequest,
     ChmodRequest,
     ChownRequest,
     CreateRequest,
@@ -18,13 +22,91 @@ from multicloud_fs_pb2 import (
     TruncateRequest,
     UnlinkRequest,
     UtimensRequest,
+    WriteChunk,
     WriteRequest,
 )
 from multicloud_fs_pb2_grpc import OperationsStub
+from replica_selector import PeerStats
+
+# Status codes that count against a peer's health (vs. per-request errors like NOT_FOUND)
+PEER_FAILURE_CODES = (
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.UNKNOWN,
+)
+WRITE_CHUNK_SIZE = (
+    1024 * 1024
+)  # bytes per WriteFile message, well below gRPC's 4 MB cap
+STREAM_TIMEOUT = 600  # seconds allowed for a whole bulk WriteFile stream
+MAX_BATCH = 512  # paths per BatchExists / BatchGetAttr request
+
+
+class _Batch:
+    def __init__(self):
+        self.paths: list[str] = []
+        self.index: dict[str, int] = {}  # path -> position in paths (duplicates share)
+        self.go = threading.Event()  # set when it is this batch's turn to be sent
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class _Coalescer:
+    # Turns concurrent single-path calls into batch calls without adding latency. With no
+    # RPC outstanding a call is sent at once (a batch of one); calls arriving while one is
+    # outstanding queue up and go out together, as the next batch, when it returns. Each
+    # batch is sent by the first caller that joined it.
+    def __init__(self, send, max_size: int = MAX_BATCH):
+        self._send = send  # [paths] -> [results], same order
+        self.max_size = max_size
+        self._queue = deque()  # batches waiting for the outstanding RPC
+        self._busy = False
+        self._lock = threading.Lock()
+
+    def call(self, path: str):
+        with self._lock:
+            leader = not self._queue or len(self._queue[-1].paths) >= self.max_size
+            if leader:
+                self._queue.append(_Batch())
+            batch = self._queue[-1]
+            pos = batch.index.get(path)
+            if pos is None:
+                pos = batch.index[path] = len(batch.paths)
+                batch.paths.append(path)
+            if not self._busy:
+                # Nothing outstanding: the batch just opened goes out right away
+                self._busy = True
+                self._queue.popleft().go.set()
+        if not leader:
+            batch.done.wait()
+        else:
+            batch.go.wait()
+            try:
+                batch.results = self._send(batch.paths)
+            except BaseException as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+                with self._lock:
+                    if self._queue:
+                        self._queue.popleft().go.set()  # next batch; still busy
+                    else:
+                        self._busy = False
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[pos]
 
 
 class GrpcClient:
-    def __init__(self, address: str, timeout: int = 10):
+    def __init__(
+        self,
+        address: str,
+        timeout: int = 10,
+        stats: PeerStats | None = None,
+        coalesce=True,
+    ):
         options = [
             (
                 "grpc.keepalive_time_ms",
@@ -45,20 +127,99 @@ class GrpcClient:
         self.channel = grpc.insecure_channel(address, options=options)
         self.stub = OperationsStub(self.channel)
         self.timeout = timeout
+        self.address = address
+        self.stats = stats if stats else PeerStats()
+        self.batching = True  # cleared if the peer predates the batch RPCs
+        self.dir_plus = True  # cleared if the peer predates ReadDirPlus
+        self._exists_batch = self._getattr_batch = None
+        if coalesce:
+            self._exists_batch = _Coalescer(self.exists_many)
+            self._getattr_batch = _Coalescer(self.getattr_many)
+
+    def close(self):
+        # In-flight calls on the channel are cancelled
+        try:
+            self.channel.close()
+        except Exception:
+            pass
+
+    def _call(self, rpc, request, timeout=None):
+        # Unary call with latency / in-flight / error accounting for replica selection
+        self.stats.begin()
+        start = time.monotonic()
+        ok = False
+        try:
+            response = rpc(request, timeout=timeout or self.timeout)
+            ok = True
+            return response
+        except grpc.RpcError as e:
+            ok = e.code() not in PEER_FAILURE_CODES
+            raise
+        finally:
+            self.stats.end(time.monotonic() - start, ok)
+
+    def _batch(self, rpc, paths: list, field: str, default, single) -> list:
+        # One Batch* call per MAX_BATCH paths; -> the `field` of each path's result, or
+        # `default` for paths the peer could not answer
+        out = []
+        for i in range(0, len(paths), MAX_BATCH):
+            chunk = paths[i : i + MAX_BATCH]
+            if not self.batching:
+                out.extend(single(p) for p in chunk)
+                continue
+            try:
+                response = self._call(rpc, BatchPathRequest(paths=chunk))
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    self.batching = False
+                    out.extend(single(p) for p in chunk)
+                    continue
+                logging.warning("gRPC batch method error: %s", e.details())
+                out.extend(default() for _ in chunk)
+                continue
+            results = response.results
+            if len(results) != len(chunk):
+                out.extend(default() for _ in chunk)
+                continue
+            out.extend(default() if r.error else getattr(r, field) for r in results)
+        return out
+
+    def exists_many(self, paths) -> list:
+        return self._batch(
+            self.stub.BatchExists, list(paths), "exists", bool, self._exists_one
+        )
+
+    def getattr_many(self, paths) -> list:
+        return self._batch(
+            self.stub.BatchGetAttr,
+            list(paths),
+            "attr",
+            GetAttrResponse,
+            self._getattr_one,
+        )
 
     def exists(self, path: str) -> bool:
+        # Coalesced with concurrent calls from other FUSE threads
+        if self._exists_batch is not None and self.batching:
+            return self._exists_batch.call(path)
+        return self._exists_one(path)
+
+    def getattr(self, path: str) -> GetAttrResponse:
+        if self._getattr_batch is not None and self.batching:
+            return self._getattr_batch.call(path)
+        return self._getattr_one(path)
+
+    def _exists_one(self, path: str) -> bool:
         try:
-            response = self.stub.Exists(ExistsRequest(path=path), timeout=self.timeout)
+            response = self._call(self.stub.Exists, ExistsRequest(path=path))
             return response.exists
         except grpc.RpcError as e:
             logging.warning("gRPC exists method error: %s", e.details())
             return False
 
-    def getattr(self, path: str) -> GetAttrResponse:
+    def _getattr_one(self, path: str) -> GetAttrResponse:
         try:
-            response = self.stub.GetAttr(
-                GetAttrRequest(path=path), timeout=self.timeout
-            )
+            response = self._call(self.stub.GetAttr, GetAttrRequest(path=path))
             return response
         except grpc.RpcError as e:
             logging.warning("gRPC getattr method error: %s", e.details())
@@ -66,38 +227,100 @@ class GrpcClient:
 
     def readdir(self, path: str, offset: int):
         try:
-            response = self.stub.ReadDir(
-                ReadDirRequest(path=path, offset=offset), timeout=self.timeout
+            response = self._call(
+                self.stub.ReadDir, ReadDirRequest(path=path, offset=offset)
             )
             return response.entries
         except grpc.RpcError as e:
             logging.warning("gRPC readdir method error: %s", e.details())
             return []
 
+    def list_dir(self, path: str, timeout=None):
+        # -> (exists, entries) from a single ReadDir; (False, []) on error
+        try:
+            response = self._call(
+                self.stub.ReadDir, ReadDirRequest(path=path), timeout=timeout
+            )
+            # Peers predating the exists field only report entries
+            return response.exists or bool(response.entries), list(response.entries)
+        except grpc.RpcError as e:
+            logging.warning("gRPC list_dir method error: %s", e.details())
+            return False, []
+
+    def list_dir_plus(self, path: str, timeout=None):
+        # -> (exists, [(name, GetAttrResponse)]) from a single ReadDirPlus. Peers without
+        # it get a plain ReadDir, with None for every attribute.
+        if self.dir_plus:
+            try:
+                response = self._call(
+                    self.stub.ReadDirPlus, ReadDirRequest(path=path), timeout=timeout
+                )
+                return response.exists, [(e.name, e.attr) for e in response.entries]
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                    logging.warning("gRPC list_dir_plus method error: %s", e.details())
+                    return False, []
+                self.dir_plus = False
+        exists, names = self.list_dir(path, timeout)
+        return exists, [(name, None) for name in names]
+
     def read(self, path: str, size: int, offset: int) -> bytes:
         try:
-            response = self.stub.Read(
-                ReadRequest(path=path, size=size, offset=offset), timeout=self.timeout
+            response = self._call(
+                self.stub.Read, ReadRequest(path=path, size=size, offset=offset)
             )
             return response.data
         except grpc.RpcError as e:
             logging.warning("gRPC read method error: %s", e.details())
             return b""
 
-    def read_file_stream(self, path: str, size: int, offset: int):
+    def read_file_stream(self, path: str, size: int, offset: int, raise_errors=False):
+        # Failures end the stream early unless raise_errors is set (callers that must
+        # tell a failed call from the end of the file)
+        self.stats.begin()
+        start = time.monotonic()
+        elapsed = None  # time to first chunk
+        ok = True
         try:
             stream = self.stub.ReadFile(
                 ReadRequest(path=path, size=size, offset=offset), timeout=self.timeout
             )
             for chunk in stream:
+                if elapsed is None:
+                    elapsed = time.monotonic() - start
                 # chunk has attribute 'content'
                 yield chunk.content
         except grpc.RpcError as e:
+            ok = e.code() not in PEER_FAILURE_CODES
             logging.warning("gRPC read_file_stream error: %s", e.details())
+            if raise_errors:
+                raise
             return
         except Exception as e:
             logging.warning("gRPC read_file_stream unexpected error: %s", e)
+            if raise_errors:
+                raise
             return
+        finally:
+            if elapsed is None:
+                elapsed = time.monotonic() - start
+            self.stats.end(elapsed, ok)
+
+    def read_range(self, path: str, size: int, offset: int):
+        # -> up to `size` bytes at `offset` (fewer only at EOF), or None if the call failed
+        parts = []
+        total = 0
+        try:
+            for part in self.read_file_stream(path, size, offset, raise_errors=True):
+                part = part[: size - total]
+                if part:
+                    parts.append(part)
+                    total += len(part)
+                if total >= size:
+                    break
+        except Exception:
+            return None
+        return b"".join(parts)
 
     def read_file(self, path: str, size: int, offset: int) -> bytes:
         data_parts = []
@@ -112,18 +335,50 @@ class GrpcClient:
 
     def write(self, path: str, data: bytes, offset: int) -> int:
         try:
-            response = self.stub.Write(
-                WriteRequest(path=path, data=data, offset=offset), timeout=self.timeout
+            response = self._call(
+                self.stub.Write, WriteRequest(path=path, data=data, offset=offset)
             )
             return response.bytes_written
         except grpc.RpcError as e:
             logging.warning("gRPC write method error: %s", e.details())
             return -1
 
+    def write_file(self, path: str, chunks, sync: bool = True) -> int:
+        # Client-streaming write of `chunks`, an iterable of (offset, bytes). The iterable is
+        # consumed lazily as HTTP/2 flow control lets messages out, so callers can read the
+        # data from disk as it is sent.
+        def requests():
+            first = True
+            for offset, data in chunks:
+                view = memoryview(data)
+                for pos in range(0, max(len(view), 1), WRITE_CHUNK_SIZE):
+                    yield WriteChunk(
+                        path=path if first else "",
+                        offset=offset + pos,
+                        content=bytes(view[pos : pos + WRITE_CHUNK_SIZE]),
+                        sync=sync and first,
+                    )
+                    first = False
+            if first:
+                yield WriteChunk(path=path, sync=sync)  # create an empty file
+
+        self.stats.begin()
+        ok = True
+        try:
+            response = self.stub.WriteFile(requests(), timeout=STREAM_TIMEOUT)
+            return response.bytes_written
+        except grpc.RpcError as e:
+            ok = e.code() not in PEER_FAILURE_CODES
+            logging.warning("gRPC write_file error: %s", e.details())
+            return -1
+        finally:
+            # Bulk transfer time says nothing about request latency; track load/errors only
+            self.stats.end(None, ok)
+
     def truncate(self, path: str, size: int):
         try:
-            response = self.stub.Truncate(
-                TruncateRequest(path=path, size=size), timeout=self.timeout
+            response = self._call(
+                self.stub.Truncate, TruncateRequest(path=path, size=size)
             )
             return response.success
         except grpc.RpcError as e:
@@ -132,8 +387,8 @@ class GrpcClient:
 
     def chown(self, path: str, uid: int, gid: int):
         try:
-            response = self.stub.Chown(
-                ChownRequest(path=path, uid=uid, gid=gid), timeout=self.timeout
+            response = self._call(
+                self.stub.Chown, ChownRequest(path=path, uid=uid, gid=gid)
             )
             return response.success
         except grpc.RpcError as e:
@@ -142,9 +397,7 @@ class GrpcClient:
 
     def chmod(self, path: str, mode: int):
         try:
-            response = self.stub.Chmod(
-                ChmodRequest(path=path, mode=mode), timeout=self.timeout
-            )
+            response = self._call(self.stub.Chmod, ChmodRequest(path=path, mode=mode))
             return response.success
         except grpc.RpcError as e:
             logging.warning("gRPC chmod method error: %s", e.details())
@@ -152,7 +405,7 @@ class GrpcClient:
 
     def unlink(self, path: str) -> bool:
         try:
-            response = self.stub.Unlink(UnlinkRequest(path=path), timeout=self.timeout)
+            response = self._call(self.stub.Unlink, UnlinkRequest(path=path))
             return response.success
         except grpc.RpcError as e:
             logging.warning("gRPC unlink method error: %s", e.details())
@@ -160,7 +413,7 @@ class GrpcClient:
 
     def rmdir(self, path: str) -> bool:
         try:
-            response = self.stub.Rmdir(RmdirRequest(path=path), timeout=self.timeout)
+            response = self._call(self.stub.Rmdir, RmdirRequest(path=path))
             return response.success
         except grpc.RpcError as e:
             logging.warning("gRPC rmdir method error: %s", e.details())
@@ -168,9 +421,8 @@ class GrpcClient:
 
     def rename(self, old_path: str, new_path: str) -> bool:
         try:
-            response = self.stub.Rename(
-                RenameRequest(old_path=old_path, new_path=new_path),
-                timeout=self.timeout,
+            response = self._call(
+                self.stub.Rename, RenameRequest(old_path=old_path, new_path=new_path)
             )
             return response.success
         except grpc.RpcError as e:
@@ -179,9 +431,7 @@ class GrpcClient:
 
     def access(self, path: str, mode: int) -> bool:
         try:
-            response = self.stub.Access(
-                AccessRequest(path=path, mode=mode), timeout=self.timeout
-            )
+            response = self._call(self.stub.Access, AccessRequest(path=path, mode=mode))
             return response.success
         except grpc.RpcError as e:
             logging.warning("gRPC access method error: %s", e.details())
@@ -202,7 +452,7 @@ class GrpcClient:
             else:
                 request = UtimensRequest(path=path, has_times=False)
 
-            response = self.stub.Utimens(request, timeout=self.timeout)
+            response = self._call(self.stub.Utimens, request)
             return response.success
         except grpc.RpcError as e:
             logging.warning("gRPC utimens method error: %s", e.details())
@@ -210,9 +460,7 @@ class GrpcClient:
 
     def mkdir(self, path: str, mode: int) -> bool:
         try:
-            response = self.stub.Mkdir(
-                MkdirRequest(path=path, mode=mode), timeout=self.timeout
-            )
+            response = self._call(self.stub.Mkdir, MkdirRequest(path=path, mode=mode))
             return response.success
         except grpc.RpcError as e:
             logging.warning("gRPC mkdir method error: %s", e.details())
@@ -220,8 +468,8 @@ class GrpcClient:
 
     def create(self, path: str, flags: int, mode: int) -> bool:
         try:
-            response = self.stub.Create(
-                CreateRequest(path=path, flags=flags, mode=mode), timeout=self.timeout
+            response = self._call(
+                self.stub.Create, CreateRequest(path=path, flags=flags, mode=mode)
             )
             return response.success
         except grpc.RpcError as e:
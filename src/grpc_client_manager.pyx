@@ -1,126 +1,350 @@
-import random
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 
-from grpc_client import GrpcClient
-from redis_client import RedisClient
+from grpc_client import WRITE_CHUNK_SIZE, GrpcClient
+from redis_client import HOSTS_CHANNEL, RedisClient
+from replica_selector import ReplicaSelector
+
+HEARTBEAT_INTERVAL = 2.0  # seconds between refreshes of this node's heartbeat key
+HEARTBEAT_TTL = 6.0  # a peer whose heartbeat is older than this is considered dead
+MEMBERSHIP_RESYNC = 30.0  # seconds between full reloads of `hosts` (missed events)
+READDIR_DEADLINE = 2.0  # seconds a cluster-wide listing waits for peers
+FANOUT_WORKERS = 16  # concurrent per-peer calls of a fan-out
 
 
 class GrpcClientManager:
-    def __init__(self, redis_client: RedisClient, url: str):
+    def __init__(self, redis_client: RedisClient, url: str, zone: str | None = None):
         self.redis_client = redis_client
         self.url = url
+        self.zone = zone
         self.clients = {}  # addr -> GrpcClient
+        self._clients_lock = threading.Lock()
+        self.selector = ReplicaSelector(url, zone)
+        self.logger = logging.getLogger(__name__)
+        self.dead: set[str] = set()  # peers without a live heartbeat at the last check
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+        self._membership_thread = None
+        self._subscription = None
+        self._fanout = ThreadPoolExecutor(
+            max_workers=FANOUT_WORKERS, thread_name_prefix="fanout"
+        )
         self.register_self(url)
         self._load_initial_hosts()
 
     # ---- host management ----
     def register_self(self, url: str):
         self.redis_client.add_to_hosts(url)
+        if self.zone:
+            try:
+                self.redis_client.set_host_zone(url, self.zone)
+            except Exception:
+                pass
+
+    def _load_zones(self):
+        try:
+            self.selector.set_zones(self.redis_client.get_host_zones())
+        except Exception:
+            pass
 
     def _load_initial_hosts(self):
         for h in self.redis_client.get_hosts():
             addr = h.decode() if isinstance(h, (bytes, bytearray)) else str(h)
             if addr != self.url:
                 self._ensure_client(addr)
+        self._load_zones()
 
     def sync_clients(self):
+        # Full reload of `hosts`: open clients for new peers, close those that left
+        hosts = set()
         for h in self.redis_client.get_hosts():
             addr = h.decode() if isinstance(h, (bytes, bytearray)) else str(h)
-            if addr != self.url and addr not in self.clients:
-                self._ensure_client(addr)
+            if addr != self.url:
+                hosts.add(addr)
+        new = hosts - set(self.clients)
+        for addr in new:
+            self._ensure_client(addr)
+        for addr in set(self.clients) - hosts:
+            self._drop_client(addr)
+        if new:
+            self._load_zones()
+
+    def _drop_client(self, address: str):
+        with self._clients_lock:
+            cli = self.clients.pop(address, None)
+        if cli is not None:
+            cli.close()
 
     def _ensure_client(self, address: str) -> GrpcClient:
-        if address not in self.clients:
-            self.clients[address] = GrpcClient(address)
-        return self.clients[address]
+        cli = self.clients.get(address)
+        if cli is None:
+            with self._clients_lock:
+                cli = self.clients.get(address)
+                if cli is None:
+                    cli = self.clients[address] = GrpcClient(
+                        address, stats=self.selector.stats_for(address)
+                    )
+        return cli
+
+    def peer_stats(self) -> dict:
+        return self.selector.snapshot()
+
+    # ---- membership ----
+    # Joins and departures arrive on HOSTS_CHANNEL, so nothing on the request path queries
+    # `hosts`; a periodic full sync repairs anything missed while unsubscribed.
+    def start_membership_watch(self, resync: float = MEMBERSHIP_RESYNC):
+        self._subscription = self.redis_client.subscribe(
+            HOSTS_CHANNEL, self._on_host_event
+        )
+        self._membership_thread = threading.Thread(
+            target=self._membership_loop, args=(resync,), daemon=True
+        )
+        self._membership_thread.start()
+
+    def _membership_loop(self, resync: float):
+        while not self._stop.wait(resync):
+            try:
+                self.sync_clients()
+            except Exception as e:
+                self.logger.warning("Membership resync failed: %s", e)
+
+    def _on_host_event(self, data: str):
+        msg = json.loads(data)
+        addr = msg.get("host")
+        if not addr or addr == self.url:
+            return
+        if msg.get("event") == "join":
+            if addr not in self.clients:
+                self.logger.info("Peer %s joined", addr)
+                self._ensure_client(addr)
+                self._load_zones()
+        elif msg.get("event") == "leave":
+            self.logger.info("Peer %s left", addr)
+            self._drop_client(addr)
+
+    # ---- liveness ----
+    def start_heartbeat(
+        self, interval: float = HEARTBEAT_INTERVAL, ttl: float = HEARTBEAT_TTL
+    ):
+        # Keep this node's heartbeat key alive and track which peers lost theirs
+        self._beat(ttl)
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop, args=(interval, ttl), daemon=True
+        )
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self, interval: float, ttl: float):
+        while not self._stop.wait(interval):
+            self._beat(ttl)
+
+    def _beat(self, ttl: float):
+        try:
+            self.redis_client.heartbeat(self.url, ttl)
+        except Exception as e:
+            self.logger.warning("Heartbeat failed: %s", e)
+            return
+        peers = list(self.clients)
+        try:
+            dead = set(peers) - self.redis_client.alive_hosts(peers)
+        except Exception:
+            return
+        for addr in dead - self.dead:
+            self.logger.warning("Peer %s stopped sending heartbeats", addr)
+        for addr in self.dead - dead:
+            self.logger.info("Peer %s is alive again", addr)
+        self.dead = dead
+
+    def usable(self, addr: str) -> bool:
+        # Alive and not cut off by its circuit breaker
+        return addr not in self.dead and self.selector.stats_for(addr).available()
 
     # ---- locations helper ----
-    def _random_remote(self, path: str):
-        locs = self.redis_client.get_locations(path)
-        if not locs:
-            return None
-        remotes = [l for l in locs if l != self.url]
+    def _live_remotes(self, path: str) -> list:
+        # Dead peers are only skipped, never removed from `loc:`: a missed lease (Redis
+        # blip, long pause) must not make a live peer's copies disappear for good
+        remotes = [l for l in self.redis_client.get_locations(path) if l != self.url]
+        return [a for a in remotes if self.usable(a)]
+
+    def _select_remote(self, path: str):
+        # Best live replica by latency / load (power of two choices), zone-local on ties
+        remotes = self._live_remotes(path)
         if not remotes:
             return None
-        addr = random.choice(remotes)
+        addr = self.selector.choose(remotes)
         self._ensure_client(addr)
         return addr
 
+    def remotes(self, path: str) -> list:
+        # All live peers holding `path` (used to stripe large reads over replicas)
+        addrs = self._live_remotes(path)
+        for addr in addrs:
+            self._ensure_client(addr)
+        return addrs
+
+    def replica_candidates(self, exclude=()) -> list:
+        # Peers that could take a new copy, best first
+        return self.selector.rank(
+            a for a in list(self.clients) if a not in exclude and self.usable(a)
+        )
+
+    def pick_remote(self, path: str):
+        # Public variant used by file handles to stick to one peer for their lifetime
+        return self._select_remote(path)
+
+    def _remote(self, path: str, addr=None, strict=False):
+        # A requested peer that is dead or tripped is replaced by another replica, unless
+        # the call must reach that peer (strict: writes targeting a specific copy)
+        if addr:
+            if self.usable(addr):
+                self._ensure_client(addr)
+                return addr
+            if strict:
+                return None
+        return self._select_remote(path)
+
     # ---- initialization / shutdown ----
-    def initialize_files(self, files):
-        for f in files:
+    def remove_manager(self):
+        # Leave the cluster: bulk-remove this node's locations via its reverse index
+        self._stop.set()
+        self._fanout.shutdown(wait=False, cancel_futures=True)
+        if self._subscription is not None:
             try:
-                self.redis_client.add_location(f, self.url)
+                self._subscription.stop()
             except Exception:
                 pass
-
-    def remove_manager(self, files):
+        try:
+            self.redis_client.clear_heartbeat(self.url)
+        except Exception:
+            pass
         self.redis_client.remove_from_hosts(self.url)
-        for f in files:
-            try:
-                self.redis_client.remove_location(f, self.url)
-            except Exception:
-                pass
+        try:
+            self.redis_client.remove_host(self.url)
+        except Exception:
+            pass
 
     # ---- remote operations (None/False => fallback/local) ----
-    def getattr(self, path):
-        addr = self._random_remote(path)
+    def getattr(self, path, addr=None):
+        addr = self._remote(path, addr)
         if not addr:
             return None
-        return self.clients[addr].getattr(path)
+        return self._ensure_client(addr).getattr(path)
+
+    @staticmethod
+    def _call_until(fn, path: str, end: float):
+        # Pool task of a fan-out: only the time left until the caller's absolute deadline is
+        # given to the RPC, and a task that starts after it (queued behind others) is skipped
+        left = end - time.monotonic()
+        if left <= 0:
+            return False, []
+        return fn(path, left)
 
-    def readdir(self, path, offset):
-        self.sync_clients()
+    def _fan_out(self, method: str, path: str, deadline: float) -> list:
+        # Call GrpcClient.<method>(path, timeout) on every live peer in parallel; -> the
+        # entry lists of the peers that hold `path` and answered within `deadline`
+        end = time.monotonic() + deadline
+        futs = {
+            self._fanout.submit(self._call_until, getattr(cli, method), path, end): addr
+            for addr, cli in list(self.clients.items())
+            if self.usable(addr)
+        }
+        if not futs:
+            return []
+        done, late = wait(futs, timeout=deadline)
+        for fut in late:
+            fut.cancel()  # still queued: never runs
+        if late:
+            self.logger.debug(
+                "%s %s: no answer from %s", method, path, [futs[f] for f in late]
+            )
         out = []
-        for addr, cli in self.clients.items():
+        for fut in done:
             try:
-                if cli.exists(path):
-                    out += cli.readdir(path, offset)
+                exists, entries = fut.result()
             except Exception:
                 continue
+            if exists:
+                out.append(entries)
+        return out
+
+    def readdir(self, path, offset=0, deadline: float = READDIR_DEADLINE):
+        # Union of the peers' listings of `path`: one ReadDir per live peer, all in
+        # parallel, returning what arrived within `deadline` (duplicates merged)
+        names = set()
+        for entries in self._fan_out("list_dir", path, deadline):
+            names.update(entries)
+        return sorted(names)[offset:]
+
+    def readdir_plus(self, path, deadline: float = READDIR_DEADLINE) -> dict:
+        # Like readdir, with attributes: name -> GetAttrResponse, or None when only older
+        # peers (plain ReadDir) listed it; the first answer with attributes wins
+        out = {}
+        for entries in self._fan_out("list_dir_plus", path, deadline):
+            for name, attr in entries:
+                if out.get(name) is None:
+                    out[name] = attr
         return out
 
-    def read(self, path, size, offset):
-        addr = self._random_remote(path)
+    def read(self, path, size, offset, addr=None):
+        addr = self._remote(path, addr)
+        if not addr:
+            return None
+        return self._ensure_client(addr).read(path, size, offset)
+
+    def read_range(self, path, size, offset, addr=None):
+        # None when no peer could be asked or the call failed (never a fake EOF)
+        addr = self._remote(path, addr)
+        if not addr:
+            return None
+        return self._ensure_client(addr).read_range(path, size, offset)
+
+    def read_stream(self, path, size, offset, addr=None):
+        addr = self._remote(path, addr)
         if not addr:
             return None
-        return self.clients[addr].read(path, size, offset)
+        return self._ensure_client(addr).read_file_stream(path, size, offset)
 
-    def read_stream(self, path, size, offset):
-        addr = self._random_remote(path)
+    def write(self, path, buf, offset, addr=None):
+        addr = self._remote(path.rsplit("/", 1)[0] or "/", addr, strict=True)
         if not addr:
             return None
-        return self.clients[addr].read_file_stream(path, size, offset)
+        if len(buf) > WRITE_CHUNK_SIZE:
+            # Too large for one message: stream it
+            return self._ensure_client(addr).write_file(path, [(offset, buf)])
+        return self._ensure_client(addr).write(path, buf, offset)
 
-    def write(self, path, buf, offset):
-        parent = path.rsplit("/", 1)[0] or "/"
-        addr = self._random_remote(parent)
+    def write_file(self, path, chunks, addr=None, sync=True):
+        # Stream (offset, bytes) pieces to a peer (bulk writes, replication)
+        addr = self._remote(path.rsplit("/", 1)[0] or "/", addr, strict=True)
         if not addr:
             return None
-        return self.clients[addr].write(path, buf, offset)
+        return self._ensure_client(addr).write_file(path, chunks, sync=sync)
 
-    def truncate(self, path, size):
-        addr = self._random_remote(path)
+    def truncate(self, path, size, addr=None):
+        addr = self._remote(path, addr, strict=True)
         if not addr:
             return None
-        return self.clients[addr].truncate(path, size)
+        return self._ensure_client(addr).truncate(path, size)
 
     def chown(self, path, uid, gid):
-        addr = self._random_remote(path)
+        addr = self._select_remote(path)
         if not addr:
             return None
-        return self.clients[addr].chown(path, uid, gid)
+        return self._ensure_client(addr).chown(path, uid, gid)
 
     def chmod(self, path, mode):
-        addr = self._random_remote(path)
+        addr = self._select_remote(path)
         if not addr:
             return None
-        return self.clients[addr].chmod(path, mode)
+        return self._ensure_client(addr).chmod(path, mode)
 
     def unlink(self, path):
-        addr = self._random_remote(path)
+        addr = self._select_remote(path)
         if not addr:
             return False
-        ok = self.clients[addr].unlink(path)
+        ok = self._ensure_client(addr).unlink(path)
         if ok:
             try:
                 self.redis_client.remove_location(path, addr)
@@ -129,10 +353,10 @@ class GrpcClientManager:
         return ok
 
     def rmdir(self, path):
-        addr = self._random_remote(path)
+        addr = self._select_remote(path)
         if not addr:
             return False
-        ok = self.clients[addr].rmdir(path)
+        ok = self._ensure_client(addr).rmdir(path)
         if ok:
             try:
                 self.redis_client.remove_location(path, addr)
@@ -141,10 +365,10 @@ class GrpcClientManager:
         return ok
 
     def rename(self, old_path, new_path):
-        addr = self._random_remote(old_path)
+        addr = self._select_remote(old_path)
         if not addr:
             return False
-        ok = self.clients[addr].rename(old_path, new_path)
+        ok = self._ensure_client(addr).rename(old_path, new_path)
         if ok:
             try:
                 self.redis_client.remove_location(old_path, addr)
@@ -154,22 +378,22 @@ class GrpcClientManager:
         return ok
 
     def access(self, path, mode):
-        addr = self._random_remote(path)
+        addr = self._select_remote(path)
         if not addr:
             return False
-        return self.clients[addr].access(path, mode)
+        return self._ensure_client(addr).access(path, mode)
 
     def utimens(self, path, times=None):
-        addr = self._random_remote(path)
+        addr = self._select_remote(path)
         if not addr:
             return False
-        return self.clients[addr].utimens(path, times)
+        return self._ensure_client(addr).utimens(path, times)
 
     def mkdir(self, path, parent_path, mode):
-        addr = self._random_remote(parent_path)
+        addr = self._select_remote(parent_path)
         if not addr:
             return False
-        ok = self.clients[addr].mkdir(path, mode)
+        ok = self._ensure_client(addr).mkdir(path, mode)
         if ok:
             try:
                 self.redis_client.add_location(path, addr)
@@ -178,10 +402,10 @@ class GrpcClientManager:
         return ok
 
     def create(self, path, parent_path, flags, mode):
-        addr = self._random_remote(parent_path)
+        addr = self._select_remote(parent_path)
         if not addr:
             return False
-        ok = self.clients[addr].create(path, flags, mode)
+        ok = self._ensure_client(addr).create(path, flags, mode)
         if ok:
             try:
                 self.redis_client.add_location(path, addr)
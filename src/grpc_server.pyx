@@ -1,3 +1,4 @@
+import errno
 import os
 from concurrent import futures
 
@@ -8,18 +9,25 @@ from multicloud_fs_pb2 import DataChunk  # added for streaming
 from multicloud_fs_pb2 import (
     AccessRequest,
     AccessResponse,
+    BatchExistsResponse,
+    BatchGetAttrResponse,
+    BatchPathRequest,
     ChmodRequest,
     ChmodResponse,
     ChownRequest,
     ChownResponse,
     CreateRequest,
     CreateResponse,
+    DirEntry,
     ExistsRequest,
     ExistsResponse,
+    ExistsResult,
     GetAttrRequest,
     GetAttrResponse,
+    GetAttrResult,
     MkdirRequest,
     MkdirResponse,
+    ReadDirPlusResponse,
     ReadDirRequest,
     ReadDirResponse,
     ReadRequest,
@@ -38,7 +46,22 @@ from multicloud_fs_pb2 import (
     WriteResponse,
 )
 from multicloud_fs_pb2_grpc import Operations, add_OperationsServicer_to_server
-from redis_client import RedisClient
+from redis_client import STAT_FLOAT_FIELDS, STAT_INT_FIELDS, RedisClient
+
+
+def _attr_response(st) -> GetAttrResponse:
+    return GetAttrResponse(
+        st_mode=st.st_mode,
+        st_ino=st.st_ino,
+        st_dev=st.st_dev,
+        st_nlink=st.st_nlink,
+        st_uid=st.st_uid,
+        st_gid=st.st_gid,
+        st_size=st.st_size,
+        st_atime=st.st_atime,
+        st_mtime=st.st_mtime,
+        st_ctime=st.st_ctime,
+    )
 
 
 class GrpcServer(Operations):
@@ -64,77 +87,101 @@ class GrpcServer(Operations):
         except Exception:
             pass
 
-    def Exists(self, request: ExistsRequest, context, **kwargs) -> ExistsResponse:
-        path = request.path
+    def _exists(self, path: str):
+        # -> (exists, errno); a missing path is not an error
         if self.cache and self.cache.has(path):
             self._register_cache_location(path)
-            return ExistsResponse(exists=True)
-        exists = os.path.exists(self.root_path + path)
-        return ExistsResponse(exists=exists)
+            return True, 0
+        try:
+            os.stat(self.root_path + path)
+            return True, 0
+        except (FileNotFoundError, NotADirectoryError):
+            return False, 0
+        except OSError as e:
+            return False, e.errno or errno.EIO
+        except ValueError:
+            return False, errno.EINVAL
 
-    def GetAttr(self, request: GetAttrRequest, context, **kwargs) -> GetAttrResponse:
-        path = request.path
-        full = self.root_path + path
+    def _attr(self, path: str):
+        # -> (GetAttrResponse, errno); zeros when the path is unknown here
         try:
-            st = os.lstat(full)
-            return GetAttrResponse(
-                st_mode=st.st_mode,
-                st_ino=st.st_ino,
-                st_dev=st.st_dev,
-                st_nlink=st.st_nlink,
-                st_uid=st.st_uid,
-                st_gid=st.st_gid,
-                st_size=st.st_size,
-                st_atime=st.st_atime,
-                st_mtime=st.st_mtime,
-                st_ctime=st.st_ctime,
-            )
-        except OSError:
-            # Try redis metadata if cached (file not on local disk but in cache)
-            if self.cache and self.cache.has(path) and self.redis:
-                try:
-                    meta = self.redis.get_metadata(path) or {}
-
-                    def _g(k, dv=0):
-                        v = (
-                            meta.get(k if isinstance(k, bytes) else k.encode())
-                            if isinstance(meta, dict)
-                            else None
-                        )
-                        if v is None:
-                            return dv
-                        try:
-                            return int(v)
-                        except Exception:
-                            try:
-                                return float(v)
-                            except Exception:
-                                return dv
-
-                    return GetAttrResponse(
-                        st_mode=_g("st_mode"),
-                        st_ino=_g("st_ino"),
-                        st_dev=_g("st_dev"),
-                        st_nlink=_g("st_nlink"),
-                        st_uid=_g("st_uid"),
-                        st_gid=_g("st_gid"),
-                        st_size=_g("st_size"),
-                        st_atime=float(_g("st_atime")),
-                        st_mtime=float(_g("st_mtime")),
-                        st_ctime=float(_g("st_ctime")),
+            return _attr_response(os.lstat(self.root_path + path)), 0
+        except OSError as e:
+            err = e.errno or errno.EIO
+        except ValueError:
+            return GetAttrResponse(), errno.EINVAL
+        # Try redis metadata if cached (file not on local disk but in cache)
+        if self.cache and self.cache.has(path) and self.redis:
+            try:
+                meta = self.redis.get_stat(path)
+                if meta:
+                    return (
+                        GetAttrResponse(
+                            **{k: meta[k] for k in STAT_INT_FIELDS + STAT_FLOAT_FIELDS}
+                        ),
+                        0,
                     )
-                except Exception:
-                    pass
-        return GetAttrResponse()  # default (zeros) – client interprets as miss
+            except Exception:
+                pass
+        return GetAttrResponse(), err
+
+    def Exists(self, request: ExistsRequest, context, **kwargs) -> ExistsResponse:
+        exists, _ = self._exists(request.path)
+        return ExistsResponse(exists=exists)
+
+    def GetAttr(self, request: GetAttrRequest, context, **kwargs) -> GetAttrResponse:
+        attr, _ = self._attr(request.path)
+        return attr  # default (zeros) – client interprets as miss
+
+    # Batches run on the one worker thread serving the call: a thousand stats cost one
+    # task and one round trip instead of a thousand
+    def BatchExists(
+        self, request: BatchPathRequest, context, **kwargs
+    ) -> BatchExistsResponse:
+        results = []
+        for path in request.paths:
+            exists, err = self._exists(path)
+            results.append(ExistsResult(path=path, exists=exists, error=err))
+        return BatchExistsResponse(results=results)
+
+    def BatchGetAttr(
+        self, request: BatchPathRequest, context, **kwargs
+    ) -> BatchGetAttrResponse:
+        results = []
+        for path in request.paths:
+            attr, err = self._attr(path)
+            results.append(GetAttrResult(path=path, attr=attr, error=err))
+        return BatchGetAttrResponse(results=results)
 
     def ReadDir(self, request: ReadDirRequest, context, **kwargs) -> ReadDirResponse:
         path = request.path
         entries = []
+        exists = False
         try:
             entries = os.listdir(self.root_path + path)
+            exists = True
         except Exception:
             pass
-        return ReadDirResponse(entries=entries)
+        return ReadDirResponse(entries=entries, exists=exists)
+
+    def ReadDirPlus(
+        self, request: ReadDirRequest, context, **kwargs
+    ) -> ReadDirPlusResponse:
+        # Entries together with their stat, so a listing needs no GetAttr per entry
+        entries = []
+        exists = False
+        try:
+            with os.scandir(self.root_path + request.path) as it:
+                for entry in it:
+                    try:
+                        attr = _attr_response(entry.stat(follow_symlinks=False))
+                    except OSError:
+                        continue
+                    entries.append(DirEntry(name=entry.name, attr=attr))
+            exists = True
+        except Exception:
+            pass
+        return ReadDirPlusResponse(entries=entries, exists=exists)
 
     def Read(self, request: ReadRequest, context, **kwargs) -> ReadResponse:
         path = request.path
@@ -227,11 +274,24 @@ class GrpcServer(Operations):
         path = request.path
         data = request.data
         offset = request.offset
-        with open(self.root_path + path, "r+b") as f:
-            f.seek(offset)
-            bytes_written = f.write(data)
+        full = self.root_path + path
+        # Replication may push a file this node has never seen
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        fd = os.open(full, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            bytes_written = os.pwrite(fd, data, offset)
+            # Durable before the writer advertises this copy in Redis
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self.cache and self.cache.has(path):
+            # Keep an already cached copy coherent with the new data
+            try:
+                self.cache.put(path, data, offset)
+            except Exception:
+                pass
         # Optionally update cache only for small files full overwrite
-        if self.cache and offset == 0 and len(data) <= MAX_MEM_CACHE_FILE_SIZE:
+        elif self.cache and offset == 0 and len(data) <= MAX_MEM_CACHE_FILE_SIZE:
             try:
                 self.cache.put(path, data)
                 self._register_cache_location(path)
@@ -239,6 +299,54 @@ class GrpcServer(Operations):
                 pass
         return WriteResponse(bytes_written=bytes_written)
 
+    def WriteFile(
+        self, request_iterator, context, **kwargs
+    ) -> WriteResponse:  # streaming
+        path = None
+        fd = None
+        sync = False
+        total = 0
+        try:
+            for chunk in request_iterator:
+                if fd is None:
+                    path = chunk.path
+                    if not path:
+                        context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                        context.set_details("First chunk must carry the path")
+                        return WriteResponse(bytes_written=0)
+                    full = self.root_path + path
+                    os.makedirs(os.path.dirname(full), exist_ok=True)
+                    fd = os.open(full, os.O_WRONLY | os.O_CREAT, 0o644)
+                sync = sync or chunk.sync
+                data = chunk.content
+                if not data:
+                    continue
+                view = memoryview(data)
+                off = chunk.offset
+                while view:
+                    n = os.pwrite(fd, view, off)
+                    view = view[n:]
+                    off += n
+                total += len(data)
+                if self.cache and self.cache.has(path):
+                    # Keep an already cached copy coherent with the new data
+                    try:
+                        self.cache.put(path, data, chunk.offset)
+                    except Exception:
+                        pass
+            if fd is not None and sync:
+                os.fsync(fd)
+        except PermissionError:
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+            context.set_details("Permission denied")
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"I/O error: {e}")
+        finally:
+            if fd is not None:
+                os.close(fd)
+        return WriteResponse(bytes_written=total)
+
     def Truncate(self, request: TruncateRequest, context, **kwargs) -> TruncateResponse:
         path = request.path
         size = request.size
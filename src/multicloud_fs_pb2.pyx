@@ -19,7 +19,7 @@ _sym_db = _symbol_database.Default()
 
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x13multicloud_fs.proto\x12\x0emulti_cloud_fs"\x1d\n\rExistsRequest\x12\x0c\n\x04path\x18\x01 \x01(\t" \n\x0e\x45xistsResponse\x12\x0e\n\x06\x65xists\x18\x01 \x01(\x08"\x1e\n\x0eGetAttrRequest\x12\x0c\n\x04path\x18\x01 \x01(\t"\xbb\x01\n\x0fGetAttrResponse\x12\x0f\n\x07st_mode\x18\x01 \x01(\x03\x12\x0e\n\x06st_ino\x18\x02 \x01(\x03\x12\x0e\n\x06st_dev\x18\x03 \x01(\x03\x12\x10\n\x08st_nlink\x18\x04 \x01(\x03\x12\x0e\n\x06st_uid\x18\x05 \x01(\x03\x12\x0e\n\x06st_gid\x18\x06 \x01(\x03\x12\x0f\n\x07st_size\x18\x07 \x01(\x03\x12\x10\n\x08st_atime\x18\x08 \x01(\x02\x12\x10\n\x08st_mtime\x18\t \x01(\x02\x12\x10\n\x08st_ctime\x18\n \x01(\x02".\n\x0eReadDirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03""\n\x0fReadDirResponse\x12\x0f\n\x07\x65ntries\x18\x01 \x03(\t"9\n\x0bReadRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x0c\n\x04size\x18\x03 \x01(\x03"\x1c\n\x0cReadResponse\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c"\x1c\n\tDataChunk\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\x0c":\n\x0cWriteRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\x0e\n\x06offset\x18\x03 \x01(\x03"&\n\rWriteResponse\x12\x15\n\rbytes_written\x18\x01 \x01(\x03"-\n\x0fTruncateRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x03"#\n\x10TruncateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"6\n\x0c\x43hownRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0b\n\x03uid\x18\x02 \x01(\x03\x12\x0b\n\x03gid\x18\x03 \x01(\x03" \n\rChownResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"*\n\x0c\x43hmodRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x03" \n\rChmodResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"\x1d\n\rUnlinkRequest\x12\x0c\n\x04path\x18\x01 \x01(\t"!\n\x0eUnlinkResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"\x1c\n\x0cRmdirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t" \n\rRmdirResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"3\n\rRenameRequest\x12\x10\n\x08old_path\x18\x01 \x01(\t\x12\x10\n\x08new_path\x18\x02 \x01(\t"!\n\x0eRenameResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"+\n\rAccessRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x05"!\n\x0e\x41\x63\x63\x65ssResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"\x7f\n\x0eUtimensRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x11\n\thas_times\x18\x02 \x01(\x08\x12\x11\n\tatime_sec\x18\x03 \x01(\x03\x12\x12\n\natime_nsec\x18\x04 \x01(\x03\x12\x11\n\tmtime_sec\x18\x05 \x01(\x03\x12\x12\n\nmtime_nsec\x18\x06 \x01(\x03""\n\x0fUtimensResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"*\n\x0cMkdirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x03" \n\rMkdirResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08":\n\rCreateRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\r\n\x05\x66lags\x18\x02 \x01(\x03\x12\x0c\n\x04mode\x18\x03 \x01(\x03"!\n\x0e\x43reateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32\xb3\t\n\nOperations\x12I\n\x06\x45xists\x12\x1d.multi_cloud_fs.ExistsRequest\x1a\x1e.multi_cloud_fs.ExistsResponse"\x00\x12L\n\x07GetAttr\x12\x1e.multi_cloud_fs.GetAttrRequest\x1a\x1f.multi_cloud_fs.GetAttrResponse"\x00\x12L\n\x07ReadDir\x12\x1e.multi_cloud_fs.ReadDirRequest\x1a\x1f.multi_cloud_fs.ReadDirResponse"\x00\x12\x43\n\x04Read\x12\x1b.multi_cloud_fs.ReadRequest\x1a\x1c.multi_cloud_fs.ReadResponse"\x00\x12\x46\n\x08ReadFile\x12\x1b.multi_cloud_fs.ReadRequest\x1a\x19.multi_cloud_fs.DataChunk"\x00\x30\x01\x12\x46\n\x05Write\x12\x1c.multi_cloud_fs.WriteRequest\x1a\x1d.multi_cloud_fs.WriteResponse"\x00\x12O\n\x08Truncate\x12\x1f.multi_cloud_fs.TruncateRequest\x1a .multi_cloud_fs.TruncateResponse"\x00\x12\x46\n\x05\x43hown\x12\x1c.multi_cloud_fs.ChownRequest\x1a\x1d.multi_cloud_fs.ChownResponse"\x00\x12\x46\n\x05\x43hmod\x12\x1c.multi_cloud_fs.ChmodRequest\x1a\x1d.multi_cloud_fs.ChmodResponse"\x00\x12I\n\x06Unlink\x12\x1d.multi_cloud_fs.UnlinkRequest\x1a\x1e.multi_cloud_fs.UnlinkResponse"\x00\x12\x46\n\x05Rmdir\x12\x1c.multi_cloud_fs.RmdirRequest\x1a\x1d.multi_cloud_fs.RmdirResponse"\x00\x12I\n\x06Rename\x12\x1d.multi_cloud_fs.RenameRequest\x1a\x1e.multi_cloud_fs.RenameResponse"\x00\x12I\n\x06\x41\x63\x63\x65ss\x12\x1d.multi_cloud_fs.AccessRequest\x1a\x1e.multi_cloud_fs.AccessResponse"\x00\x12L\n\x07Utimens\x12\x1e.multi_cloud_fs.UtimensRequest\x1a\x1f.multi_cloud_fs.UtimensResponse"\x00\x12\x46\n\x05Mkdir\x12\x1c.multi_cloud_fs.MkdirRequest\x1a\x1d.multi_cloud_fs.MkdirResponse"\x00\x12I\n\x06\x43reate\x12\x1d.multi_cloud_fs.CreateRequest\x1a\x1e.multi_cloud_fs.CreateResponse"\x00\x62\x06proto3'
+    b'\n\x13multicloud_fs.proto\x12\x0emulti_cloud_fs"\x1d\n\rExistsRequest\x12\x0c\n\x04path\x18\x01 \x01(\t" \n\x0e\x45xistsResponse\x12\x0e\n\x06\x65xists\x18\x01 \x01(\x08"\x1e\n\x0eGetAttrRequest\x12\x0c\n\x04path\x18\x01 \x01(\t"\xbb\x01\n\x0fGetAttrResponse\x12\x0f\n\x07st_mode\x18\x01 \x01(\x03\x12\x0e\n\x06st_ino\x18\x02 \x01(\x03\x12\x0e\n\x06st_dev\x18\x03 \x01(\x03\x12\x10\n\x08st_nlink\x18\x04 \x01(\x03\x12\x0e\n\x06st_uid\x18\x05 \x01(\x03\x12\x0e\n\x06st_gid\x18\x06 \x01(\x03\x12\x0f\n\x07st_size\x18\x07 \x01(\x03\x12\x10\n\x08st_atime\x18\x08 \x01(\x02\x12\x10\n\x08st_mtime\x18\t \x01(\x02\x12\x10\n\x08st_ctime\x18\n \x01(\x02"!\n\x10\x42\x61tchPathRequest\x12\r\n\x05paths\x18\x01 \x03(\t";\n\x0c\x45xistsResult\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06\x65xists\x18\x02 \x01(\x08\x12\r\n\x05\x65rror\x18\x03 \x01(\x05"D\n\x13\x42\x61tchExistsResponse\x12-\n\x07results\x18\x01 \x03(\x0b\x32\x1c.multi_cloud_fs.ExistsResult"[\n\rGetAttrResult\x12\x0c\n\x04path\x18\x01 \x01(\t\x12-\n\x04\x61ttr\x18\x02 \x01(\x0b\x32\x1f.multi_cloud_fs.GetAttrResponse\x12\r\n\x05\x65rror\x18\x03 \x01(\x05"F\n\x14\x42\x61tchGetAttrResponse\x12.\n\x07results\x18\x01 \x03(\x0b\x32\x1d.multi_cloud_fs.GetAttrResult".\n\x0eReadDirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03"2\n\x0fReadDirResponse\x12\x0f\n\x07\x65ntries\x18\x01 \x03(\t\x12\x0e\n\x06\x65xists\x18\x02 \x01(\x08"G\n\x08\x44irEntry\x12\x0c\n\x04name\x18\x01 \x01(\t\x12-\n\x04\x61ttr\x18\x02 \x01(\x0b\x32\x1f.multi_cloud_fs.GetAttrResponse"P\n\x13ReadDirPlusResponse\x12)\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x18.multi_cloud_fs.DirEntry\x12\x0e\n\x06\x65xists\x18\x02 \x01(\x08"9\n\x0bReadRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x0c\n\x04size\x18\x03 \x01(\x03"\x1c\n\x0cReadResponse\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c"\x1c\n\tDataChunk\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\x0c":\n\x0cWriteRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\x0e\n\x06offset\x18\x03 \x01(\x03"I\n\nWriteChunk\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\x0c\x12\x0c\n\x04sync\x18\x04 \x01(\x08"&\n\rWriteResponse\x12\x15\n\rbytes_written\x18\x01 \x01(\x03"-\n\x0fTruncateRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x03"#\n\x10TruncateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"6\n\x0c\x43hownRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0b\n\x03uid\x18\x02 \x01(\x03\x12\x0b\n\x03gid\x18\x03 \x01(\x03" \n\rChownResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"*\n\x0c\x43hmodRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x03" \n\rChmodResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"\x1d\n\rUnlinkRequest\x12\x0c\n\x04path\x18\x01 \x01(\t"!\n\x0eUnlinkResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"\x1c\n\x0cRmdirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t" \n\rRmdirResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"3\n\rRenameRequest\x12\x10\n\x08old_path\x18\x01 \x01(\t\x12\x10\n\x08new_path\x18\x02 \x01(\t"!\n\x0eRenameResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"+\n\rAccessRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x05"!\n\x0e\x41\x63\x63\x65ssResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"\x7f\n\x0eUtimensRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x11\n\thas_times\x18\x02 \x01(\x08\x12\x11\n\tatime_sec\x18\x03 \x01(\x03\x12\x12\n\natime_nsec\x18\x04 \x01(\x03\x12\x11\n\tmtime_sec\x18\x05 \x01(\x03\x12\x12\n\nmtime_nsec\x18\x06 \x01(\x03""\n\x0fUtimensResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"*\n\x0cMkdirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x03" \n\rMkdirResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08":\n\rCreateRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\r\n\x05\x66lags\x18\x02 \x01(\x03\x12\x0c\n\x04mode\x18\x03 \x01(\x03"!\n\x0e\x43reateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32\x87\x0c\n\nOperations\x12I\n\x06\x45xists\x12\x1d.multi_cloud_fs.ExistsRequest\x1a\x1e.multi_cloud_fs.ExistsResponse"\x00\x12L\n\x07GetAttr\x12\x1e.multi_cloud_fs.GetAttrRequest\x1a\x1f.multi_cloud_fs.GetAttrResponse"\x00\x12V\n\x0b\x42\x61tchExists\x12 .multi_cloud_fs.BatchPathRequest\x1a#.multi_cloud_fs.BatchExistsResponse"\x00\x12X\n\x0c\x42\x61tchGetAttr\x12 .multi_cloud_fs.BatchPathRequest\x1a$.multi_cloud_fs.BatchGetAttrResponse"\x00\x12L\n\x07ReadDir\x12\x1e.multi_cloud_fs.ReadDirRequest\x1a\x1f.multi_cloud_fs.ReadDirResponse"\x00\x12T\n\x0bReadDirPlus\x12\x1e.multi_cloud_fs.ReadDirRequest\x1a#.multi_cloud_fs.ReadDirPlusResponse"\x00\x12\x43\n\x04Read\x12\x1b.multi_cloud_fs.ReadRequest\x1a\x1c.multi_cloud_fs.ReadResponse"\x00\x12\x46\n\x08ReadFile\x12\x1b.multi_cloud_fs.ReadRequest\x1a\x19.multi_cloud_fs.DataChunk"\x00\x30\x01\x12\x46\n\x05Write\x12\x1c.multi_cloud_fs.WriteRequest\x1a\x1d.multi_cloud_fs.WriteResponse"\x00\x12J\n\tWriteFile\x12\x1a.multi_cloud_fs.WriteChunk\x1a\x1d.multi_cloud_fs.WriteResponse"\x00(\x01\x12O\n\x08Truncate\x12\x1f.multi_cloud_fs.TruncateRequest\x1a .multi_cloud_fs.TruncateResponse"\x00\x12\x46\n\x05\x43hown\x12\x1c.multi_cloud_fs.ChownRequest\x1a\x1d.multi_cloud_fs.ChownResponse"\x00\x12\x46\n\x05\x43hmod\x12\x1c.multi_cloud_fs.ChmodRequest\x1a\x1d.multi_cloud_fs.ChmodResponse"\x00\x12I\n\x06Unlink\x12\x1d.multi_cloud_fs.UnlinkRequest\x1a\x1e.multi_cloud_fs.UnlinkResponse"\x00\x12\x46\n\x05Rmdir\x12\x1c.multi_cloud_fs.RmdirRequest\x1a\x1d.multi_cloud_fs.RmdirResponse"\x00\x12I\n\x06Rename\x12\x1d.multi_cloud_fs.RenameRequest\x1a\x1e.multi_cloud_fs.RenameResponse"\x00\x12I\n\x06\x41\x63\x63\x65ss\x12\x1d.multi_cloud_fs.AccessRequest\x1a\x1e.multi_cloud_fs.AccessResponse"\x00\x12L\n\x07Utimens\x12\x1e.multi_cloud_fs.UtimensRequest\x1a\x1f.multi_cloud_fs.UtimensResponse"\x00\x12\x46\n\x05Mkdir\x12\x1c.multi_cloud_fs.MkdirRequest\x1a\x1d.multi_cloud_fs.MkdirResponse"\x00\x12I\n\x06\x43reate\x12\x1d.multi_cloud_fs.CreateRequest\x1a\x1e.multi_cloud_fs.CreateResponse"\x00\x62\x06proto3'
 )
 
 _globals = globals()
@@ -35,60 +35,76 @@ if not _descriptor._USE_C_DESCRIPTORS:
     _globals["_GETATTRREQUEST"]._serialized_end = 134
     _globals["_GETATTRRESPONSE"]._serialized_start = 137
     _globals["_GETATTRRESPONSE"]._serialized_end = 324
-    _globals["_READDIRREQUEST"]._serialized_start = 326
-    _globals["_READDIRREQUEST"]._serialized_end = 372
-    _globals["_READDIRRESPONSE"]._serialized_start = 374
-    _globals["_READDIRRESPONSE"]._serialized_end = 408
-    _globals["_READREQUEST"]._serialized_start = 410
-    _globals["_READREQUEST"]._serialized_end = 467
-    _globals["_READRESPONSE"]._serialized_start = 469
-    _globals["_READRESPONSE"]._serialized_end = 497
-    _globals["_DATACHUNK"]._serialized_start = 499
-    _globals["_DATACHUNK"]._serialized_end = 527
-    _globals["_WRITEREQUEST"]._serialized_start = 529
-    _globals["_WRITEREQUEST"]._serialized_end = 587
-    _globals["_WRITERESPONSE"]._serialized_start = 589
-    _globals["_WRITERESPONSE"]._serialized_end = 627
-    _globals["_TRUNCATEREQUEST"]._serialized_start = 629
-    _globals["_TRUNCATEREQUEST"]._serialized_end = 674
-    _globals["_TRUNCATERESPONSE"]._serialized_start = 676
-    _globals["_TRUNCATERESPONSE"]._serialized_end = 711
-    _globals["_CHOWNREQUEST"]._serialized_start = 713
-    _globals["_CHOWNREQUEST"]._serialized_end = 767
-    _globals["_CHOWNRESPONSE"]._serialized_start = 769
-    _globals["_CHOWNRESPONSE"]._serialized_end = 801
-    _globals["_CHMODREQUEST"]._serialized_start = 803
-    _globals["_CHMODREQUEST"]._serialized_end = 845
-    _globals["_CHMODRESPONSE"]._serialized_start = 847
-    _globals["_CHMODRESPONSE"]._serialized_end = 879
-    _globals["_UNLINKREQUEST"]._serialized_start = 881
-    _globals["_UNLINKREQUEST"]._serialized_end = 910
-    _globals["_UNLINKRESPONSE"]._serialized_start = 912
-    _globals["_UNLINKRESPONSE"]._serialized_end = 945
-    _globals["_RMDIRREQUEST"]._serialized_start = 947
-    _globals["_RMDIRREQUEST"]._serialized_end = 975
-    _globals["_RMDIRRESPONSE"]._serialized_start = 977
-    _globals["_RMDIRRESPONSE"]._serialized_end = 1009
-    _globals["_RENAMEREQUEST"]._serialized_start = 1011
-    _globals["_RENAMEREQUEST"]._serialized_end = 1062
-    _globals["_RENAMERESPONSE"]._serialized_start = 1064
-    _globals["_RENAMERESPONSE"]._serialized_end = 1097
-    _globals["_ACCESSREQUEST"]._serialized_start = 1099
-    _globals["_ACCESSREQUEST"]._serialized_end = 1142
-    _globals["_ACCESSRESPONSE"]._serialized_start = 1144
-    _globals["_ACCESSRESPONSE"]._serialized_end = 1177
-    _globals["_UTIMENSREQUEST"]._serialized_start = 1179
-    _globals["_UTIMENSREQUEST"]._serialized_end = 1306
-    _globals["_UTIMENSRESPONSE"]._serialized_start = 1308
-    _globals["_UTIMENSRESPONSE"]._serialized_end = 1342
-    _globals["_MKDIRREQUEST"]._serialized_start = 1344
-    _globals["_MKDIRREQUEST"]._serialized_end = 1386
-    _globals["_MKDIRRESPONSE"]._serialized_start = 1388
-    _globals["_MKDIRRESPONSE"]._serialized_end = 1420
-    _globals["_CREATEREQUEST"]._serialized_start = 1422
-    _globals["_CREATEREQUEST"]._serialized_end = 1480
-    _globals["_CREATERESPONSE"]._serialized_start = 1482
-    _globals["_CREATERESPONSE"]._serialized_end = 1515
-    _globals["_OPERATIONS"]._serialized_start = 1518
-    _globals["_OPERATIONS"]._serialized_end = 2721
+    _globals["_BATCHPATHREQUEST"]._serialized_start = 326
+    _globals["_BATCHPATHREQUEST"]._serialized_end = 359
+    _globals["_EXISTSRESULT"]._serialized_start = 361
+    _globals["_EXISTSRESULT"]._serialized_end = 420
+    _globals["_BATCHEXISTSRESPONSE"]._serialized_start = 422
+    _globals["_BATCHEXISTSRESPONSE"]._serialized_end = 490
+    _globals["_GETATTRRESULT"]._serialized_start = 492
+    _globals["_GETATTRRESULT"]._serialized_end = 583
+    _globals["_BATCHGETATTRRESPONSE"]._serialized_start = 585
+    _globals["_BATCHGETATTRRESPONSE"]._serialized_end = 655
+    _globals["_READDIRREQUEST"]._serialized_start = 657
+    _globals["_READDIRREQUEST"]._serialized_end = 703
+    _globals["_READDIRRESPONSE"]._serialized_start = 705
+    _globals["_READDIRRESPONSE"]._serialized_end = 755
+    _globals["_DIRENTRY"]._serialized_start = 757
+    _globals["_DIRENTRY"]._serialized_end = 828
+    _globals["_READDIRPLUSRESPONSE"]._serialized_start = 830
+    _globals["_READDIRPLUSRESPONSE"]._serialized_end = 910
+    _globals["_READREQUEST"]._serialized_start = 912
+    _globals["_READREQUEST"]._serialized_end = 969
+    _globals["_READRESPONSE"]._serialized_start = 971
+    _globals["_READRESPONSE"]._serialized_end = 999
+    _globals["_DATACHUNK"]._serialized_start = 1001
+    _globals["_DATACHUNK"]._serialized_end = 1029
+    _globals["_WRITEREQUEST"]._serialized_start = 1031
+    _globals["_WRITEREQUEST"]._serialized_end = 1089
+    _globals["_WRITECHUNK"]._serialized_start = 1091
+    _globals["_WRITECHUNK"]._serialized_end = 1164
+    _globals["_WRITERESPONSE"]._serialized_start = 1166
+    _globals["_WRITERESPONSE"]._serialized_end = 1204
+    _globals["_TRUNCATEREQUEST"]._serialized_start = 1206
+    _globals["_TRUNCATEREQUEST"]._serialized_end = 1251
+    _globals["_TRUNCATERESPONSE"]._serialized_start = 1253
+    _globals["_TRUNCATERESPONSE"]._serialized_end = 1288
+    _globals["_CHOWNREQUEST"]._serialized_start = 1290
+    _globals["_CHOWNREQUEST"]._serialized_end = 1344
+    _globals["_CHOWNRESPONSE"]._serialized_start = 1346
+    _globals["_CHOWNRESPONSE"]._serialized_end = 1378
+    _globals["_CHMODREQUEST"]._serialized_start = 1380
+    _globals["_CHMODREQUEST"]._serialized_end = 1422
+    _globals["_CHMODRESPONSE"]._serialized_start = 1424
+    _globals["_CHMODRESPONSE"]._serialized_end = 1456
+    _globals["_UNLINKREQUEST"]._serialized_start = 1458
+    _globals["_UNLINKREQUEST"]._serialized_end = 1487
+    _globals["_UNLINKRESPONSE"]._serialized_start = 1489
+    _globals["_UNLINKRESPONSE"]._serialized_end = 1522
+    _globals["_RMDIRREQUEST"]._serialized_start = 1524
+    _globals["_RMDIRREQUEST"]._serialized_end = 1552
+    _globals["_RMDIRRESPONSE"]._serialized_start = 1554
+    _globals["_RMDIRRESPONSE"]._serialized_end = 1586
+    _globals["_RENAMEREQUEST"]._serialized_start = 1588
+    _globals["_RENAMEREQUEST"]._serialized_end = 1639
+    _globals["_RENAMERESPONSE"]._serialized_start = 1641
+    _globals["_RENAMERESPONSE"]._serialized_end = 1674
+    _globals["_ACCESSREQUEST"]._serialized_start = 1676
+    _globals["_ACCESSREQUEST"]._serialized_end = 1719
+    _globals["_ACCESSRESPONSE"]._serialized_start = 1721
+    _globals["_ACCESSRESPONSE"]._serialized_end = 1754
+    _globals["_UTIMENSREQUEST"]._serialized_start = 1756
+    _globals["_UTIMENSREQUEST"]._serialized_end = 1883
+    _globals["_UTIMENSRESPONSE"]._serialized_start = 1885
+    _globals["_UTIMENSRESPONSE"]._serialized_end = 1919
+    _globals["_MKDIRREQUEST"]._serialized_start = 1921
+    _globals["_MKDIRREQUEST"]._serialized_end = 1963
+    _globals["_MKDIRRESPONSE"]._serialized_start = 1965
+    _globals["_MKDIRRESPONSE"]._serialized_end = 1997
+    _globals["_CREATEREQUEST"]._serialized_start = 1999
+    _globals["_CREATEREQUEST"]._serialized_end = 2057
+    _globals["_CREATERESPONSE"]._serialized_start = 2059
+    _globals["_CREATERESPONSE"]._serialized_end = 2092
+    _globals["_OPERATIONS"]._serialized_start = 2095
+    _globals["_OPERATIONS"]._serialized_end = 3638
 # @@protoc_insertion_point(module_scope)
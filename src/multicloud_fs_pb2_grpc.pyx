@@ -50,12 +50,30 @@ class OperationsStub(object):
             response_deserializer=multicloud__fs__pb2.GetAttrResponse.FromString,
             _registered_method=True,
         )
+        self.BatchExists = channel.unary_unary(
+            "/multi_cloud_fs.Operations/BatchExists",
+            request_serializer=multicloud__fs__pb2.BatchPathRequest.SerializeToString,
+            response_deserializer=multicloud__fs__pb2.BatchExistsResponse.FromString,
+            _registered_method=True,
+        )
+        self.BatchGetAttr = channel.unary_unary(
+            "/multi_cloud_fs.Operations/BatchGetAttr",
+            request_serializer=multicloud__fs__pb2.BatchPathRequest.SerializeToString,
+            response_deserializer=multicloud__fs__pb2.BatchGetAttrResponse.FromString,
+            _registered_method=True,
+        )
         self.ReadDir = channel.unary_unary(
             "/multi_cloud_fs.Operations/ReadDir",
             request_serializer=multicloud__fs__pb2.ReadDirRequest.SerializeToString,
             response_deserializer=multicloud__fs__pb2.ReadDirResponse.FromString,
             _registered_method=True,
         )
+        self.ReadDirPlus = channel.unary_unary(
+            "/multi_cloud_fs.Operations/ReadDirPlus",
+            request_serializer=multicloud__fs__pb2.ReadDirRequest.SerializeToString,
+            response_deserializer=multicloud__fs__pb2.ReadDirPlusResponse.FromString,
+            _registered_method=True,
+        )
         self.Read = channel.unary_unary(
             "/multi_cloud_fs.Operations/Read",
             request_serializer=multicloud__fs__pb2.ReadRequest.SerializeToString,
@@ -74,6 +92,12 @@ class OperationsStub(object):
             response_deserializer=multicloud__fs__pb2.WriteResponse.FromString,
             _registered_method=True,
         )
+        self.WriteFile = channel.stream_unary(
+            "/multi_cloud_fs.Operations/WriteFile",
+            request_serializer=multicloud__fs__pb2.WriteChunk.SerializeToString,
+            response_deserializer=multicloud__fs__pb2.WriteResponse.FromString,
+            _registered_method=True,
+        )
         self.Truncate = channel.unary_unary(
             "/multi_cloud_fs.Operations/Truncate",
             request_serializer=multicloud__fs__pb2.TruncateRequest.SerializeToString,
@@ -151,12 +175,30 @@ class OperationsServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def BatchExists(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def BatchGetAttr(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def ReadDir(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def ReadDirPlus(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def Read(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -175,6 +217,12 @@ class OperationsServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def WriteFile(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def Truncate(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -248,11 +296,26 @@ def add_OperationsServicer_to_server(servicer, server):
             request_deserializer=multicloud__fs__pb2.GetAttrRequest.FromString,
             response_serializer=multicloud__fs__pb2.GetAttrResponse.SerializeToString,
         ),
+        "BatchExists": grpc.unary_unary_rpc_method_handler(
+            servicer.BatchExists,
+            request_deserializer=multicloud__fs__pb2.BatchPathRequest.FromString,
+            response_serializer=multicloud__fs__pb2.BatchExistsResponse.SerializeToString,
+        ),
+        "BatchGetAttr": grpc.unary_unary_rpc_method_handler(
+            servicer.BatchGetAttr,
+            request_deserializer=multicloud__fs__pb2.BatchPathRequest.FromString,
+            response_serializer=multicloud__fs__pb2.BatchGetAttrResponse.SerializeToString,
+        ),
         "ReadDir": grpc.unary_unary_rpc_method_handler(
             servicer.ReadDir,
             request_deserializer=multicloud__fs__pb2.ReadDirRequest.FromString,
             response_serializer=multicloud__fs__pb2.ReadDirResponse.SerializeToString,
         ),
+        "ReadDirPlus": grpc.unary_unary_rpc_method_handler(
+            servicer.ReadDirPlus,
+            request_deserializer=multicloud__fs__pb2.ReadDirRequest.FromString,
+            response_serializer=multicloud__fs__pb2.ReadDirPlusResponse.SerializeToString,
+        ),
         "Read": grpc.unary_unary_rpc_method_handler(
             servicer.Read,
             request_deserializer=multicloud__fs__pb2.ReadRequest.FromString,
@@ -268,6 +331,11 @@ def add_OperationsServicer_to_server(servicer, server):
             request_deserializer=multicloud__fs__pb2.WriteRequest.FromString,
             response_serializer=multicloud__fs__pb2.WriteResponse.SerializeToString,
         ),
+        "WriteFile": grpc.stream_unary_rpc_method_handler(
+            servicer.WriteFile,
+            request_deserializer=multicloud__fs__pb2.WriteChunk.FromString,
+            response_serializer=multicloud__fs__pb2.WriteResponse.SerializeToString,
+        ),
         "Truncate": grpc.unary_unary_rpc_method_handler(
             servicer.Truncate,
             request_deserializer=multicloud__fs__pb2.TruncateRequest.FromString,
@@ -392,6 +460,66 @@ class Operations(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def BatchExists(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/multi_cloud_fs.Operations/BatchExists",
+            multicloud__fs__pb2.BatchPathRequest.SerializeToString,
+            multicloud__fs__pb2.BatchExistsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def BatchGetAttr(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/multi_cloud_fs.Operations/BatchGetAttr",
+            multicloud__fs__pb2.BatchPathRequest.SerializeToString,
+            multicloud__fs__pb2.BatchGetAttrResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def ReadDir(
         request,
@@ -422,6 +550,36 @@ class Operations(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def ReadDirPlus(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/multi_cloud_fs.Operations/ReadDirPlus",
+            multicloud__fs__pb2.ReadDirRequest.SerializeToString,
+            multicloud__fs__pb2.ReadDirPlusResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def Read(
         request,
@@ -512,6 +670,36 @@ class Operations(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def WriteFile(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            "/multi_cloud_fs.Operations/WriteFile",
+            multicloud__fs__pb2.WriteChunk.SerializeToString,
+            multicloud__fs__pb2.WriteResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def Truncate(
         request,
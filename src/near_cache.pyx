@@ -0,0 +1,185 @@
+# cython: language_level=3
+import logging
+import threading
+from collections import OrderedDict
+
+import redis
+
+NEAR_CACHE_BYTES = 0  # default size of RedisClient's near-cache; 0 disables it
+TRACKED_PREFIXES = ("inode:", "loc:", "dir:")
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+MAX_INVALIDATION_LOG = 100000  # recent per-key invalidations kept for put() race checks
+RECONNECT_DELAY = 1.0
+
+
+def _sizeof(value) -> int:
+    # Rough memory estimate; only used to bound the cache
+    if value is None:
+        return 16
+    if isinstance(value, (bytes, bytearray, str)):
+        return 49 + len(value)
+    if isinstance(value, dict):
+        return 64 + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 56 + sum(_sizeof(v) for v in value)
+    return 32
+
+
+class NearCache:
+    # Node-local copy of hot Redis reads (inode, location and directory keys), bounded by
+    # an estimated byte size with LRU eviction. Coherence comes from Redis client tracking
+    # in broadcast mode: a listener connection is told about every change to the tracked
+    # prefixes and drops those keys. While that connection is down nothing is cached, and
+    # everything is flushed when it comes back, since invalidations may have been missed.
+    #
+    # Readers take seq() before querying Redis and pass it to put(); a value is refused if
+    # its key was invalidated in between, so a late put cannot resurrect stale data.
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()  # key -> {sub: value}
+        self._sizes: dict[str, int] = {}
+        self._bytes = 0
+        self._seq = 0
+        self._floor = 0  # puts that started before this seq are refused
+        self._log: "OrderedDict[str, int]" = OrderedDict()  # key -> seq invalidated at
+        self._lock = threading.Lock()
+        self._active = False
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # ------------- cache -------------
+    def seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def get(self, key: str, sub=None):
+        # -> (hit, value)
+        with self._lock:
+            subs = self._entries.get(key)
+            if subs is not None and sub in subs:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, subs[sub]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value, seq: int, sub=None):
+        with self._lock:
+            if not self._active or seq < self._floor or self._log.get(key, -1) > seq:
+                return
+            subs = self._entries.get(key)
+            if subs is None:
+                subs = self._entries[key] = {}
+            subs[sub] = value
+            size = _sizeof(key) + sum(_sizeof(v) for v in subs.values())
+            self._bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._entries.move_to_end(key)
+            while self._bytes > self.max_bytes and self._entries:
+                old, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self._seq += 1
+            for key in keys:
+                self._log.pop(key, None)
+                self._log[key] = self._seq
+                if self._entries.pop(key, None) is not None:
+                    self._bytes -= self._sizes.pop(key)
+                    self.invalidations += 1
+            while len(self._log) > MAX_INVALIDATION_LOG:
+                _, seq = self._log.popitem(last=False)
+                self._floor = max(self._floor, seq)
+
+    def clear(self):
+        with self._lock:
+            self._seq += 1
+            self._floor = self._seq
+            self._log.clear()
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "active": self._active,
+            }
+
+    # ------------- invalidation listener -------------
+    def start(self, client: redis.Redis):
+        self._thread = threading.Thread(
+            target=self._listen, args=(client,), name="near-cache", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._set_active(False)
+
+    def _set_active(self, active: bool):
+        self.clear()
+        with self._lock:
+            self._active = active
+
+    def _connect(self, client: redis.Redis):
+        # One connection both enables tracking and receives the invalidations (RESP2:
+        # redirected to itself, then subscribed to the invalidation channel)
+        conn = client.connection_pool.make_connection()
+        conn.connect()
+        conn.send_command("CLIENT", "ID")
+        cid = conn.read_response()
+        args = ["CLIENT", "TRACKING", "ON", "REDIRECT", cid, "BCAST"]
+        for prefix in TRACKED_PREFIXES:
+            args += ["PREFIX", prefix]
+        conn.send_command(*args)
+        conn.read_response()
+        conn.send_command("SUBSCRIBE", INVALIDATE_CHANNEL)
+        conn.read_response()
+        return conn
+
+    def _listen(self, client: redis.Redis):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect(client)
+                self._set_active(True)
+                while not self._stop.is_set():
+                    if not conn.can_read(timeout=1.0):
+                        continue
+                    msg = conn.read_response()
+                    if not isinstance(msg, list) or len(msg) < 3:
+                        continue
+                    if msg[0] not in (b"message", "message"):
+                        continue
+                    keys = msg[2]
+                    if keys is None:
+                        self.clear()  # FLUSHDB / FLUSHALL
+                    else:
+                        self.invalidate(
+                            *[
+                                k.decode() if isinstance(k, (bytes, bytearray)) else k
+                                for k in keys
+                            ]
+                        )
+            except Exception as e:
+                self.logger.warning("Near-cache invalidation stream lost: %s", e)
+            finally:
+                # Missed invalidations cannot be replayed: start over empty
+                self._set_active(False)
+                if conn is not None:
+                    try:
+                        conn.disconnect()
+                    except Exception:
+                        pass
+            self._stop.wait(RECONNECT_DELAY)
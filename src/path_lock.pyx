@@ -0,0 +1,135 @@
+# cython: language_level=3
+import functools
+import threading
+from contextlib import contextmanager
+
+
+class _RWLock:
+    # Reader/writer lock preferring writers. Re-entrant per thread (a writer may also take
+    # the read side), so FUSE ops can call each other on the same path; upgrading a read
+    # lock to a write lock is not supported.
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: dict[int, int] = {}  # thread id -> depth
+        self._writer = None  # thread id
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self.refs = 0  # PathLocks users, guarded by PathLocks._lock
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers[me] = 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers.pop(me) - 1
+            if depth:
+                self._readers[me] = depth
+            elif not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+
+class PathLocks:
+    # Per-path reader/writer locks, created on demand and dropped once unused
+    def __init__(self):
+        self._locks: dict[str, _RWLock] = {}
+        self._lock = threading.Lock()
+
+    def _ref(self, path: str) -> _RWLock:
+        with self._lock:
+            lock = self._locks.get(path)
+            if lock is None:
+                lock = self._locks[path] = _RWLock()
+            lock.refs += 1
+            return lock
+
+    def _unref(self, path: str, lock: _RWLock):
+        with self._lock:
+            lock.refs -= 1
+            if not lock.refs:
+                self._locks.pop(path, None)
+
+    @contextmanager
+    def read(self, path: str):
+        lock = self._ref(path)
+        try:
+            lock.acquire_read()
+            try:
+                yield
+            finally:
+                lock.release_read()
+        finally:
+            self._unref(path, lock)
+
+    @contextmanager
+    def write(self, *paths):
+        # Several paths (rename) are always taken in sorted order to avoid deadlocks
+        held = []
+        try:
+            for path in sorted(set(paths)):
+                lock = self._ref(path)
+                try:
+                    lock.acquire_write()
+                except BaseException:
+                    self._unref(path, lock)
+                    raise
+                held.append((path, lock))
+            yield
+        finally:
+            for path, lock in reversed(held):
+                try:
+                    lock.release_write()
+                finally:
+                    self._unref(path, lock)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locks)
+
+
+def locked(exclusive=True, npaths: int = 1):
+    # Method decorator for MultiCloudFS ops: hold the lock of the first `npaths` path
+    # arguments (normalised with self._norm) for the duration of the call
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            paths = [self._norm(p) for p in args[:npaths]]
+            if exclusive:
+                ctx = self.locks.write(*paths)
+            else:
+                ctx = self.locks.read(paths[0])
+            with ctx:
+                return fn(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,100 @@
+# cython: language_level=3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+READAHEAD_MIN = 256 * 1024  # first window once a sequential pattern is seen
+READAHEAD_MAX = 8 * 1024 * 1024  # window stops doubling here
+READAHEAD_WORKERS = 4
+MAX_TRACKED_STREAMS = 1024
+
+
+class _Stream:
+    def __init__(self):
+        self.next_off = 0  # where the next sequential read is expected
+        self.window = 0  # current prefetch window, 0 while access looks random
+        self.prefetched_to = 0  # end of the range already requested ahead
+        self.eof = None  # file end learnt from a short prefetch
+
+
+class ReadAhead:
+    # Sequential-access detector for remote files. Each read reports its range; once reads
+    # follow each other, growing windows ahead of the reader are fetched on a thread pool.
+    # `fetch(path, size, offset, peer)` must read remotely and store the data in the cache.
+    def __init__(
+        self,
+        fetch,
+        min_window: int = READAHEAD_MIN,
+        max_window: int = READAHEAD_MAX,
+        workers: int = READAHEAD_WORKERS,
+    ):
+        self.fetch = fetch
+        self.min_window = min(min_window, max_window)
+        self.max_window = max_window
+        self.logger = logging.getLogger(__name__)
+        self._streams: "OrderedDict[str, _Stream]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="readahead"
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_window > 0
+
+    def on_read(self, path: str, offset: int, size: int, peer: str | None = None):
+        if not self.enabled or size <= 0:
+            return
+        end = offset + size
+        with self._lock:
+            st = self._streams.pop(path, None) or _Stream()
+            self._streams[path] = st  # MRU
+            while len(self._streams) > MAX_TRACKED_STREAMS:
+                self._streams.popitem(last=False)
+            if st.next_off and offset <= st.next_off <= end:
+                st.window = min(max(st.window * 2, self.min_window), self.max_window)
+            elif offset != st.next_off:
+                # Random access: stop prefetching until a sequential run starts again
+                st.window = 0
+                st.prefetched_to = 0
+            st.next_off = end
+            if not st.window:
+                return
+            start = max(st.prefetched_to, end)
+            stop = end + st.window
+            if st.eof is not None:
+                stop = min(stop, st.eof)
+            # Top the window up only once half of it has been consumed
+            if stop - start < st.window // 2:
+                return
+            st.prefetched_to = stop
+        self._pool.submit(self._prefetch, path, start, stop - start, peer)
+
+    def _prefetch(self, path: str, offset: int, size: int, peer):
+        try:
+            data = self.fetch(path, size, offset, peer)
+        except Exception as e:
+            self.logger.debug("Read-ahead of %s failed: %s", path, e)
+            data = None
+        if data is None:
+            # Failed, not short: no end of file learnt; the next read requests it again
+            with self._lock:
+                st = self._streams.get(path)
+                if st is not None:
+                    st.prefetched_to = min(st.prefetched_to, offset)
+            return
+        got = len(data)
+        if got < size:
+            with self._lock:
+                st = self._streams.get(path)
+                if st is not None:
+                    st.eof = offset + got
+                    st.prefetched_to = min(st.prefetched_to, offset + got)
+
+    def forget(self, path: str):
+        with self._lock:
+            self._streams.pop(path, None)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
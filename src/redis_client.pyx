@@ -1,13 +1,419 @@
 # cython: language_level=3
+import json
 import os
 import random
+import struct
 
 import redis
+from redis.cluster import RedisCluster
+
+from near_cache import NEAR_CACHE_BYTES, NearCache
+
+STAT_INT_FIELDS = (
+    "st_mode",
+    "st_ino",
+    "st_dev",
+    "st_nlink",
+    "st_uid",
+    "st_gid",
+    "st_size",
+)
+STAT_FLOAT_FIELDS = ("st_atime", "st_mtime", "st_ctime")
+DIR_PAGE_SIZE = 1000  # entries fetched per ZRANGE when listing a directory
+HOST_BATCH = 1000  # paths handled per script call when a node leaves
+REPLICA_LOST_CHANNEL = "replica_lost"
+HOSTS_CHANNEL = (
+    "hosts"  # {"event": "join" | "leave", "host": url} on membership changes
+)
+
+# ------------- inode encodings -------------
+# hash: one string field per stat value (readable with redis-cli, the historical layout).
+# packed: a single field "p" holding a fixed-size little-endian record; about 70 bytes
+# instead of ~11 fields of decimal text, and decoding is one struct unpack.
+INODE_HASH = "hash"
+INODE_PACKED = "packed"
+INODE_ENCODINGS = (INODE_HASH, INODE_PACKED)
+PACKED_FIELD = "p"
+PACKED_VERSION = 1
+# version, flags (bit 0: is_dir), st_mode, st_ino, st_dev, st_nlink, st_uid, st_gid,
+# st_size, st_atime, st_mtime, st_ctime
+_PACKED = struct.Struct("<BBIQQIIIqddd")
+_HASH_FIELDS = STAT_INT_FIELDS + STAT_FLOAT_FIELDS + ("is_dir",)
+
+# ------------- server-side scripts -------------
+# Compound namespace mutations run as one atomic EVALSHA each (see RedisClient._run_script).
+# The host index key comes last and is optional: in cluster mode it lives in another slot,
+# so it is left out and updated by a separate command.
+_SCRIPTS = {
+    # Drops ARGV[1] from the location sets in KEYS; -> keys that had it
+    "remove_host": """
+local lost = {}
+for _, key in ipairs(KEYS) do
+  if redis.call('SREM', key, ARGV[1]) == 1 then
+    table.insert(lost, key)
+  end
+end
+return lost
+""",
+    # KEYS: inode, parent dir, loc[, host index]
+    # ARGV: name, path, host, field1, value1, ... (the inode record is replaced)
+    "create_entry": """
+if #ARGV > 3 then
+  redis.call('DEL', KEYS[1])
+  redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+end
+redis.call('ZADD', KEYS[2], 0, ARGV[1])
+redis.call('SADD', KEYS[3], ARGV[3])
+if KEYS[4] then
+  redis.call('SADD', KEYS[4], ARGV[2])
+end
+return 1
+""",
+    # KEYS: loc, inode, parent dir[, host index]; ARGV: host, path, name
+    # -> locations left; the last one takes the inode and directory entry along
+    "unlink": """
+redis.call('SREM', KEYS[1], ARGV[1])
+if KEYS[4] then
+  redis.call('SREM', KEYS[4], ARGV[2])
+end
+local left = redis.call('SCARD', KEYS[1])
+if left == 0 then
+  redis.call('DEL', KEYS[2])
+  redis.call('ZREM', KEYS[3], ARGV[3])
+end
+return left
+""",
+    # KEYS: inode, loc, parent dir[, own dir index, host index]; ARGV: name, path
+    "rmdir": """
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('ZREM', KEYS[3], ARGV[1])
+if KEYS[5] then
+  redis.call('DEL', KEYS[4])
+  redis.call('SREM', KEYS[5], ARGV[2])
+end
+return 1
+""",
+    # KEYS: old inode, new inode, old loc, new loc, old parent dir, new parent dir[, host index]
+    # ARGV: host, old path, new path, old name, new name
+    # Other nodes' host index entries for either path go stale; they only make remove_host
+    # issue a no-op SREM.
+    "rename": """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  redis.call('RENAME', KEYS[1], KEYS[2])
+end
+redis.call('DEL', KEYS[3], KEYS[4])
+redis.call('SADD', KEYS[4], ARGV[1])
+if KEYS[7] then
+  redis.call('SREM', KEYS[7], ARGV[2])
+  redis.call('SADD', KEYS[7], ARGV[3])
+end
+redis.call('ZREM', KEYS[5], ARGV[4])
+redis.call('ZADD', KEYS[6], 0, ARGV[5])
+return 1
+""",
+}
+
+
+def _to_str(v) -> str:
+    return v.decode() if isinstance(v, (bytes, bytearray)) else str(v)
+
+
+def pack_metadata(meta: dict) -> bytes:
+    st = [int(float(meta.get(k, 0) or 0)) for k in STAT_INT_FIELDS]
+    st += [float(meta.get(k, 0) or 0) for k in STAT_FLOAT_FIELDS]
+    is_dir = meta.get("is_dir") in (True, "True", b"True")
+    return _PACKED.pack(PACKED_VERSION, 1 if is_dir else 0, *st)
+
+
+def _unpacked(rec) -> dict:
+    out = dict(zip(STAT_INT_FIELDS + STAT_FLOAT_FIELDS, rec[2:]))
+    out["is_dir"] = bool(rec[1] & 1)
+    return out
+
+
+def unpack_metadata_many(blobs) -> list:
+    # Packed records -> stat dicts (None for unknown versions). Records of the current
+    # version are decoded together with one struct.iter_unpack over their concatenation.
+    out = [None] * len(blobs)
+    idx = [
+        i
+        for i, b in enumerate(blobs)
+        if b and len(b) == _PACKED.size and b[0] == PACKED_VERSION
+    ]
+    if idx:
+        recs = _PACKED.iter_unpack(b"".join(blobs[i] for i in idx))
+        for i, rec in zip(idx, recs):
+            out[i] = _unpacked(rec)
+    return out
+
+
+def _is_dir_value(is_dir, packed) -> bool:
+    # From HMGET(inode, "is_dir", "p"), whichever encoding the record uses
+    if packed:
+        return bool(len(packed) > 1 and packed[1] & 1)
+    return _to_str(is_dir or "") == "True"
+
+
+def decode_metadata_many(metas, locations=None) -> list:
+    # Vectorised decode_metadata: packed records are unpacked in one pass
+    raws = [{_to_str(k): v for k, v in m.items()} if m else {} for m in metas]
+    unpacked = unpack_metadata_many([r.get(PACKED_FIELD) for r in raws])
+    if locations is None:
+        locations = [None] * len(raws)
+    return [
+        decode_metadata(r, locs, st) if r else {}
+        for r, locs, st in zip(raws, locations, unpacked)
+    ]
+
+
+def decode_metadata(meta, locations=None, unpacked=None) -> dict:
+    # Raw inode hash (bytes or str keys/values, either encoding) -> typed stat fields,
+    # is_dir and locations (members of the path's location set, or the legacy in-hash
+    # string)
+    if not meta:
+        return {}
+    raw = {_to_str(k): v for k, v in meta.items()}
+    if unpacked is None and raw.get(PACKED_FIELD):
+        unpacked = unpack_metadata_many([raw[PACKED_FIELD]])[0]
+    if unpacked is not None:
+        out = dict(unpacked)
+    else:
+        out = _decode_hash_fields(raw)
+    if locations is not None:
+        out["locations"] = sorted(_to_str(x) for x in locations)
+    else:
+        out["locations"] = [
+            x for x in _to_str(raw.get("locations", "")).split(";") if x
+        ]
+    return out
+
+
+def _decode_hash_fields(raw: dict) -> dict:
+    out = {}
+    for k in STAT_INT_FIELDS:
+        try:
+            out[k] = int(float(_to_str(raw.get(k, 0))))
+        except ValueError:
+            out[k] = 0
+    for k in STAT_FLOAT_FIELDS:
+        try:
+            out[k] = float(_to_str(raw.get(k, 0)))
+        except ValueError:
+            out[k] = 0.0
+    out["is_dir"] = _to_str(raw.get("is_dir", "")) == "True"
+    return out
 
 
 class RedisClient:
-    def __init__(self, url: str):
-        self.redis = redis.Redis.from_url(url)
+    def __init__(
+        self,
+        url: str,
+        cluster=False,
+        inode_encoding: str = INODE_HASH,
+        near_cache_bytes: int = NEAR_CACHE_BYTES,
+    ):
+        # cluster: `url` is any node of a Redis Cluster; keys are hash-tagged by directory
+        # (see _slot_tag) so each namespace operation stays within one slot.
+        # inode_encoding: layout of inode records written by this client; both are read.
+        # near_cache_bytes: size of the local cache of inode/location/directory reads
+        # (see near_cache.pyx); 0 disables it. Not available in cluster mode, where
+        # tracking would need a listener per shard.
+        if inode_encoding not in INODE_ENCODINGS:
+            raise ValueError(f"Unknown inode encoding: {inode_encoding}")
+        self.inode_encoding = inode_encoding
+        self.cluster = bool(cluster)
+        if self.cluster:
+            self.redis = RedisCluster.from_url(url)
+        else:
+            self.redis = redis.Redis.from_url(url)
+        self._scripts = {
+            name: self.redis.register_script(src) for name, src in _SCRIPTS.items()
+        }
+        # Whether location reads must also look for the legacy `locations` inode field;
+        # cleared once migrate_locations finds (or records) the finished migration
+        self.legacy_locations = not self.cluster
+        self.near = None
+        if near_cache_bytes > 0 and not self.cluster:
+            self.near = NearCache(near_cache_bytes)
+            self.near.start(self.redis)
+
+    def close(self):
+        if self.near is not None:
+            self.near.stop()
+
+    # ------------- near-cache -------------
+    # Reads consult self.near first; writes made through this client drop the keys they
+    # touch right away instead of waiting for the server's invalidation message.
+    def _forget(self, *keys):
+        if self.near is not None:
+            self.near.invalidate(*keys)
+
+    def _near_seq(self) -> int:
+        return self.near.seq() if self.near is not None else 0
+
+    def _near_get(self, key: str, sub=None):
+        if self.near is None:
+            return False, None
+        return self.near.get(key, sub)
+
+    def _near_put(self, key: str, value, seq: int, sub=None):
+        if self.near is not None:
+            self.near.put(key, value, seq, sub)
+
+    def _forget_paths(self, paths):
+        # Every cached key of these paths: inode, locations and parent directory
+        keys = []
+        for p in paths:
+            keys += [
+                self._inode_key(p),
+                self._loc_key(p),
+                self._dir_key(os.path.dirname(self._norm(p))),
+            ]
+        self._forget(*keys)
+
+    def near_cache_stats(self) -> dict:
+        return self.near.stats() if self.near is not None else {}
+
+    # ------------- server-side scripts -------------
+    def load_scripts(self):
+        # Preload all scripts so the first call of each is a plain EVALSHA
+        for script in self._scripts.values():
+            self.redis.script_load(script.script)
+
+    def _run_script(self, name: str, keys: list, args: list, dir_keys=()):
+        # EVALSHA (reloading the script if the server lost it). A parent directory still
+        # stored as a legacy set is migrated and the (idempotent) script retried.
+        try:
+            return self._scripts[name](keys=keys, args=args, client=self.redis)
+        except redis.ResponseError as e:
+            if "WRONGTYPE" not in str(e) or not dir_keys:
+                raise
+            for key in dir_keys:
+                self._migrate_dir_key(key)
+            return self._scripts[name](keys=keys, args=args, client=self.redis)
+        finally:
+            self._forget(*keys)
+
+    def _pipeline(self, transaction=True):
+        # Cluster pipelines cannot be MULTI/EXEC: their commands span slots and are sent
+        # per node, each still atomic on its own
+        return self.redis.pipeline(transaction=transaction and not self.cluster)
+
+    def _host_keys(self, host: str) -> list:
+        # Trailing optional script key: the host index, unless it lives in another slot
+        return [] if self.cluster else [self._host_key(host)]
+
+    def _create_entry(self, path: str, meta: dict, host: str):
+        p = self._norm(path)
+        parent, name = os.path.split(p)
+        args = [name, p, host]
+        for k, v in self._encode_meta(meta).items():
+            args += [k, v]
+        dir_key = self._dir_key(parent)
+        if self.cluster:
+            # Index first: a stale index entry is harmless, a missing one is not
+            self.redis.sadd(self._host_key(host), p)
+        return self._run_script(
+            "create_entry",
+            [self._inode_key(p), dir_key, self._loc_key(p)] + self._host_keys(host),
+            args,
+            dir_keys=[dir_key],
+        )
+
+    def create_file(self, path: str, meta: dict, host: str):
+        # Metadata, parent directory entry and location of a new file in one round trip
+        return self._create_entry(path, meta, host)
+
+    def make_dir(self, path: str, meta: dict, host: str):
+        return self._create_entry(path, meta, host)
+
+    def unlink_path(self, path: str, host: str) -> int:
+        # Drop `host`'s copy; the last copy removes the inode and the directory entry.
+        # -> number of locations left
+        p = self._norm(path)
+        parent, name = os.path.split(p)
+        dir_key = self._dir_key(parent)
+        left = self._run_script(
+            "unlink",
+            [self._loc_key(p), self._inode_key(p), dir_key] + self._host_keys(host),
+            [host, p, name],
+            dir_keys=[dir_key],
+        )
+        if self.cluster:
+            self.redis.srem(self._host_key(host), p)
+        return left
+
+    def rmdir_path(self, path: str, host: str):
+        p = self._norm(path)
+        parent, name = os.path.split(p)
+        dir_key = self._dir_key(parent)
+        keys = [self._inode_key(p), self._loc_key(p), dir_key]
+        if not self.cluster:
+            keys += [self._dir_key(p), self._host_key(host)]
+        res = self._run_script("rmdir", keys, [name, p], dir_keys=[dir_key])
+        if self.cluster:
+            pipe = self._pipeline()
+            pipe.delete(self._dir_key(p))
+            pipe.srem(self._host_key(host), p)
+            pipe.execute()
+            self._forget(self._dir_key(p))
+        return res
+
+    def rename_path(self, old_path: str, new_path: str, host: str):
+        # Move the inode to the new path; `host` becomes the only location of the new path
+        old, new = self._norm(old_path), self._norm(new_path)
+        old_parent, old_name = os.path.split(old)
+        new_parent, new_name = os.path.split(new)
+        dir_keys = [self._dir_key(old_parent), self._dir_key(new_parent)]
+        if self.cluster:
+            self.redis.sadd(self._host_key(host), new)
+            if old_parent != new_parent:
+                # Different directories hash to different slots: no atomic script
+                self._rename_across_slots(old, new, host)
+                self.redis.srem(self._host_key(host), old)
+                return 1
+        res = self._run_script(
+            "rename",
+            [
+                self._inode_key(old),
+                self._inode_key(new),
+                self._loc_key(old),
+                self._loc_key(new),
+            ]
+            + dir_keys
+            + self._host_keys(host),
+            [host, old, new, old_name, new_name],
+            dir_keys=dir_keys,
+        )
+        if self.cluster:
+            self.redis.srem(self._host_key(host), old)
+        return res
+
+    def _rename_across_slots(self, old: str, new: str, host: str):
+        # Cluster fallback: build the new entry completely before dropping the old one, so
+        # a crash in between leaves both names visible rather than none
+        meta = self.redis.hgetall(self._inode_key(old))
+        new_parent, new_name = os.path.split(new)
+        old_parent, old_name = os.path.split(old)
+        pipe = self._pipeline()
+        pipe.delete(self._inode_key(new), self._loc_key(new))
+        if meta:
+            pipe.hset(self._inode_key(new), mapping=meta)
+        pipe.sadd(self._loc_key(new), host)
+        pipe.zadd(self._dir_key(new_parent), {new_name: 0})
+        pipe.execute()
+        pipe = self._pipeline()
+        pipe.delete(self._inode_key(old), self._loc_key(old))
+        pipe.zrem(self._dir_key(old_parent), old_name)
+        pipe.execute()
+        self._forget(
+            self._inode_key(new),
+            self._loc_key(new),
+            self._dir_key(new_parent),
+            self._inode_key(old),
+            self._loc_key(old),
+            self._dir_key(old_parent),
+        )
 
     # ------------- path normalization -------------
     def _norm(self, path):  # return Python str object
@@ -21,21 +427,89 @@ class RedisClient:
             path = path.rstrip("/")
         return path or "/"
 
+    def _slot_tag(self, path: str) -> str:
+        # Cluster mode: "{<parent dir>}", so an entry's inode and location keys hash to the
+        # same slot as the parent's directory index (dir keys are tagged by their own path)
+        if not self.cluster:
+            return ""
+        return "{" + os.path.dirname(path) + "}"
+
     def _inode_key(self, path):
-        return "inode:" + self._norm(path)
+        p = self._norm(path)
+        return "inode:" + self._slot_tag(p) + p
 
     def _dir_key(self, path):
-        return "dir:" + self._norm(path)
+        p = self._norm(path)
+        return "dir:{" + p + "}" if self.cluster else "dir:" + p
+
+    def _host_key(self, address):
+        # Reverse location index: every path `address` holds a copy of
+        return "host:" + address
 
     # ------------- cluster hosts (unchanged semantics) -------------
     def get_hosts(self):
         return self.redis.smembers("hosts")
 
+    def _host_event(self, event: str, host: str, change):
+        pipe = self._pipeline()
+        change(pipe)
+        pipe.publish(HOSTS_CHANNEL, json.dumps({"event": event, "host": host}))
+        return pipe.execute()[0]
+
     def add_to_hosts(self, host):
-        return self.redis.sadd("hosts", host)
+        return self._host_event("join", host, lambda pipe: pipe.sadd("hosts", host))
 
     def remove_from_hosts(self, host):
-        return self.redis.srem("hosts", host)
+        return self._host_event("leave", host, lambda pipe: pipe.srem("hosts", host))
+
+    # ------------- replication factor overrides -------------
+    def set_replication_factor(self, dir_path: str, factor: int | None):
+        # Per-directory override, inherited by the whole subtree; None removes it
+        if factor is None:
+            return self.redis.hdel("replication", dir_path)
+        return self.redis.hset("replication", dir_path, int(factor))
+
+    def get_replication_factor(self, path: str):
+        # Nearest ancestor override of `path`, or None
+        ancestors = []
+        p = path
+        while p not in ("", "/"):
+            p = p.rsplit("/", 1)[0] or "/"
+            ancestors.append(p)
+        if not ancestors:
+            return None
+        for v in self.redis.hmget("replication", ancestors):
+            if v is not None:
+                return int(v)
+        return None
+
+    # ------------- liveness -------------
+    # hb:<url> exists while the node keeps refreshing it (see GrpcClientManager); a
+    # crashed node's key expires after `ttl` seconds.
+    def _heartbeat_key(self, address):
+        return "hb:" + address
+
+    def heartbeat(self, address: str, ttl: float):
+        return self.redis.set(self._heartbeat_key(address), 1, px=int(ttl * 1000))
+
+    def clear_heartbeat(self, address: str):
+        return self.redis.delete(self._heartbeat_key(address))
+
+    def alive_hosts(self, addresses) -> set:
+        # The subset of `addresses` with a live heartbeat, in one round trip
+        addresses = list(addresses)
+        reader = self.redis.pipeline(transaction=False)
+        for address in addresses:
+            reader.exists(self._heartbeat_key(address))
+        return {a for a, n in zip(addresses, reader.execute()) if n}
+
+    def set_host_zone(self, host, zone):
+        return self.redis.hset("host_zones", host, zone)
+
+    def get_host_zones(self) -> dict:
+        return {
+            _to_str(h): _to_str(z) for h, z in self.redis.hgetall("host_zones").items()
+        }
 
     # ------------- legacy simple key interface (kept for backward compat; avoid new usage) -------------
     def get(self, key):
@@ -49,55 +523,238 @@ class RedisClient:
 
     # ------------- inode metadata -------------
     def get_metadata(self, path):
-        return self.redis.hgetall(self._inode_key(path))
+        key = self._inode_key(path)
+        hit, raw = self._near_get(key)
+        if not hit:
+            seq = self._near_seq()
+            raw = self.redis.hgetall(key)
+            self._near_put(key, raw, seq)
+        return dict(raw)
+
+    def get_stat(self, path):
+        # Decoded inode metadata (see decode_metadata), or None when the path is unknown
+        return self.get_stat_many([path])[self._norm(path)]
+
+    def get_stat_many(self, paths) -> dict:
+        # path -> decoded metadata or None, in one round trip
+        norm = [self._norm(p) for p in paths]
+        raws, members = [None] * len(norm), [None] * len(norm)
+        missing = []
+        for i, p in enumerate(norm):
+            hit_raw, raws[i] = self._near_get(self._inode_key(p))
+            hit_locs, members[i] = self._near_get(self._loc_key(p))
+            if not (hit_raw and hit_locs):
+                missing.append(i)
+        if missing:
+            seq = self._near_seq()
+            reader = self.redis.pipeline(transaction=False)
+            for i in missing:
+                reader.hgetall(self._inode_key(norm[i]))
+                reader.smembers(self._loc_key(norm[i]))
+            res = reader.execute()
+            for i, raw, locs in zip(missing, res[0::2], res[1::2]):
+                p = norm[i]
+                if raw and (b"locations" in raw or "locations" in raw):
+                    locs = self.get_locations(p)  # legacy field: migrate it
+                else:
+                    locs = sorted(_to_str(m) for m in locs)
+                    self._near_put(self._inode_key(p), raw, seq)
+                    self._near_put(self._loc_key(p), locs, seq)
+                raws[i], members[i] = raw, locs
+        metas = decode_metadata_many(raws, members)
+        return {p: m if m.get("st_mode") else None for p, m in zip(norm, metas)}
+
+    def _encode_meta(self, metadata: dict) -> dict:
+        # Full inode record in this client's encoding -> hash fields to store
+        if self.inode_encoding == INODE_PACKED:
+            return {PACKED_FIELD: pack_metadata(metadata)}
+        return {k: str(v) for k, v in metadata.items()}
+
+    def _stale_fields(self) -> tuple:
+        # Fields of the other encoding, dropped when a record is rewritten
+        if self.inode_encoding == INODE_PACKED:
+            return _HASH_FIELDS
+        return (PACKED_FIELD,)
+
+    def _queue_set_metadata(self, pipe, path, metadata: dict):
+        key = self._inode_key(path)
+        pipe.hset(key, mapping=self._encode_meta(metadata))
+        pipe.hdel(key, *self._stale_fields())
 
     def set_metadata(self, path, metadata: dict):
-        # Ensure stringified values
-        p = self._norm(path)
-        kv = {k: str(v) for k, v in metadata.items()}
-        # Initialize locations field if absent
-        if "locations" not in kv:
-            existing = self.redis.hget(self._inode_key(p), "locations")
-            if existing is None:
-                kv["locations"] = ""
-        return self.redis.hmset(self._inode_key(p), kv)
+        pipe = self._pipeline()
+        self._queue_set_metadata(pipe, path, metadata)
+        try:
+            return pipe.execute()[0]
+        finally:
+            self._forget(self._inode_key(path))
 
     def remove_metadata(self, path):
-        return self.redis.delete(self._inode_key(path))
+        # The inode goes together with its location set
+        try:
+            return self.redis.delete(self._inode_key(path), self._loc_key(path))
+        finally:
+            self._forget(self._inode_key(path), self._loc_key(path))
 
     # ------------- locations management -------------
+    # loc:/path is a set of the node URLs holding a copy, so adds and removes are single
+    # atomic commands. Older deployments kept a ";"-joined `locations` field in the inode
+    # hash; it is folded into the set on first read (or in bulk by migrate_locations).
+    def _loc_key(self, path):
+        p = self._norm(path)
+        return "loc:" + self._slot_tag(p) + p
+
+    def _migrate_location_field(self, path, legacy) -> list:
+        p = self._norm(path)
+        parts = [x for x in _to_str(legacy).split(";") if x]
+        pipe = self._pipeline()
+        if parts:
+            pipe.sadd(self._loc_key(p), *parts)
+            for address in parts:
+                pipe.sadd(self._host_key(address), p)
+        pipe.hdel(self._inode_key(p), "locations")
+        pipe.execute()
+        self._forget(self._inode_key(p), self._loc_key(p))
+        return parts
+
+    def migrate_locations(self, batch: int = 1000) -> int:
+        # Bulk conversion of legacy location strings; runs once per Redis database (never
+        # needed in cluster mode, which older versions did not support)
+        if self.cluster or self.redis.hget("migrations", "locations"):
+            self.legacy_locations = False
+            return 0
+        migrated = 0
+        keys = []
+        for key in self.redis.scan_iter(match="inode:*", count=batch, _type="hash"):
+            keys.append(key)
+            if len(keys) >= batch:
+                migrated += self._migrate_location_keys(keys)
+                keys = []
+        if keys:
+            migrated += self._migrate_location_keys(keys)
+        self.redis.hset("migrations", "locations", 1)
+        self.legacy_locations = False
+        return migrated
+
+    def _migrate_location_keys(self, keys: list) -> int:
+        migrated = 0
+        for key, legacy in self._hget_many(keys, "locations").items():
+            if legacy is not None:
+                self._migrate_location_field(_to_str(key)[len("inode:") :], legacy)
+                migrated += 1
+        return migrated
+
     def get_locations(self, path: str):
-        val = self.redis.hget(self._inode_key(path), "locations")
-        if not val:
-            return []
-        s = val.decode() if isinstance(val, (bytes, bytearray)) else str(val)
-        return [x for x in s.split(";") if x]
+        return self.get_locations_many([path])[self._norm(path)]
+
+    def get_locations_many(self, paths) -> dict:
+        # path -> sorted node URLs, for many paths in one round trip
+        norm = [self._norm(p) for p in paths]
+        out = {}
+        missing = []
+        for p in norm:
+            hit, locs = self._near_get(self._loc_key(p))
+            if hit:
+                out[p] = list(locs)
+            else:
+                missing.append(p)
+        if not missing:
+            return out
+        seq = self._near_seq()
+        reader = self.redis.pipeline(transaction=False)
+        for p in missing:
+            reader.smembers(self._loc_key(p))
+            if self.legacy_locations:
+                reader.hget(self._inode_key(p), "locations")
+        res = reader.execute()
+        if self.legacy_locations:
+            pairs = zip(missing, res[0::2], res[1::2])
+        else:
+            pairs = zip(missing, res, [None] * len(res))
+        for p, members, legacy in pairs:
+            locs = {_to_str(m) for m in members}
+            if legacy is not None:
+                locs.update(self._migrate_location_field(p, legacy))
+            else:
+                self._near_put(self._loc_key(p), sorted(locs), seq)
+            out[p] = sorted(locs)
+        return out
 
     def add_location(self, path: str, address: str):
-        key = self._inode_key(path)
+        p = self._norm(path)
+        pipe = self._pipeline()
+        pipe.sadd(self._loc_key(p), address)
+        pipe.sadd(self._host_key(address), p)
+        try:
+            pipe.execute()
+        finally:
+            self._forget(self._loc_key(p))
+        return True
+
+    def add_locations(self, paths, address: str):
+        # Bulk add_location in one round trip (scans, replication)
+        pipe = self._pipeline()
+        keys = []
+        for path in paths:
+            p = self._norm(path)
+            keys.append(self._loc_key(p))
+            pipe.sadd(self._loc_key(p), address)
+            pipe.sadd(self._host_key(address), p)
+        try:
+            pipe.execute()
+        finally:
+            self._forget(*keys)
+
+    def remove_location(self, path: str, address: str):
+        p = self._norm(path)
+        pipe = self._pipeline()
+        pipe.srem(self._loc_key(p), address)
+        pipe.srem(self._host_key(address), p)
+        try:
+            removed, _ = pipe.execute()
+        finally:
+            self._forget(self._loc_key(p))
+        return bool(removed)
+
+    def _hget_many(self, keys: list, field: str) -> dict:
+        # One round trip for many HGETs; safe after WATCH since reads do not affect it
+        reader = self.redis.pipeline(transaction=False)
+        for key in keys:
+            reader.hget(key, field)
+        return dict(zip(keys, reader.execute()))
+
+    def remove_locations(self, paths, address: str):
+        # Bulk remove_location; files left without any location also lose their inode
+        # and directory entry (directories keep theirs: other nodes may hold them)
+        norm = [self._norm(p) for p in paths]
+        if not norm:
+            return
+        if self.cluster:
+            return self._remove_locations_cluster(norm, address)
         pipe = self.redis.pipeline()
         while True:
             try:
-                pipe.watch(key)
-                current = pipe.hget(key, "locations")
-                if current:
-                    txt = (
-                        current.decode()
-                        if isinstance(current, (bytes, bytearray))
-                        else str(current)
-                    )
-                    parts = [x for x in txt.split(";") if x]
-                    if address in parts:
-                        pipe.unwatch()
-                        return True
-                    parts.append(address)
-                    new_val = ";".join(parts)
-                else:
-                    new_val = address
+                pipe.watch(*[self._loc_key(p) for p in norm])
+                reader = self.redis.pipeline(transaction=False)
+                for p in norm:
+                    reader.sismember(self._loc_key(p), address)
+                    reader.scard(self._loc_key(p))
+                    reader.hmget(self._inode_key(p), "is_dir", PACKED_FIELD)
+                res = reader.execute()
                 pipe.multi()
-                pipe.hset(key, "locations", new_val)
+                rows = zip(norm, res[0::3], res[1::3], res[2::3])
+                for p, held, count, kind in rows:
+                    if not held:
+                        continue
+                    pipe.srem(self._loc_key(p), address)
+                    pipe.srem(self._host_key(address), p)
+                    if count == 1 and not _is_dir_value(*kind) and p != "/":
+                        parent, name = os.path.split(p)
+                        pipe.delete(self._inode_key(p))
+                        pipe.zrem(self._dir_key(parent), name)
                 pipe.execute()
-                return True
+                self._forget_paths(norm)
+                return
             except redis.WatchError:
                 continue
             finally:
@@ -106,51 +763,251 @@ class RedisClient:
                 except Exception:
                     pass
 
-    def remove_location(self, path: str, address: str):
-        key = self._inode_key(path)
-        pipe = self.redis.pipeline()
+    def _remove_locations_cluster(self, norm: list, address: str):
+        # No WATCH across slots: the unlink script decides per path (atomic within its slot)
+        reader = self._pipeline(transaction=False)
+        for p in norm:
+            reader.hmget(self._inode_key(p), "is_dir", PACKED_FIELD)
+        dirs = []
+        for p, kind in zip(norm, reader.execute()):
+            if _is_dir_value(*kind) or p == "/":
+                dirs.append(p)
+            else:
+                self.unlink_path(p, address)
+        pipe = self._pipeline()
+        for p in dirs:
+            pipe.srem(self._loc_key(p), address)
+            pipe.srem(self._host_key(address), p)
+        pipe.execute()
+        self._forget_paths(dirs)
+
+    def _drop_host_from(self, paths: list, address: str) -> list:
+        # -> the paths whose location set contained `address`
+        if not self.cluster:
+            lost = self._run_script(
+                "remove_host", [self._loc_key(p) for p in paths], [address]
+            )
+            by_key = {self._loc_key(p): p for p in paths}
+            return [by_key[_to_str(k)] for k in lost]
+        # Location keys of a batch span many slots: pipelined SREMs instead of one script
+        pipe = self._pipeline()
+        for p in paths:
+            pipe.srem(self._loc_key(p), address)
+        try:
+            return [p for p, removed in zip(paths, pipe.execute()) if removed]
+        finally:
+            self._forget(*[self._loc_key(p) for p in paths])
+
+    def remove_host(self, address: str, batch: int = HOST_BATCH) -> int:
+        # Node departure: drop `address` from every location it holds, using its reverse
+        # index, in ceil(n / batch) script calls; each batch of affected paths is published
+        # on REPLICA_LOST_CHANNEL. -> number of paths that lost the replica
+        host_key = self._host_key(address)
+        lost_total = 0
+        cursor = 0
         while True:
+            cursor, members = self.redis.sscan(host_key, cursor, count=batch)
+            paths = [_to_str(m) for m in members]
+            if paths:
+                lost = self._drop_host_from(paths, address)
+                lost_total += len(lost)
+                if lost:
+                    self.redis.publish(
+                        REPLICA_LOST_CHANNEL,
+                        json.dumps({"host": address, "paths": lost}),
+                    )
+            if not cursor:
+                break
+        self.redis.delete(host_key)
+        return lost_total
+
+    def get_host_paths(self, address: str) -> list:
+        return [_to_str(m) for m in self.redis.smembers(self._host_key(address))]
+
+    # ------------- pub/sub -------------
+    def subscribe(self, channel: str, callback):
+        # Run callback(data: str) for every message on `channel` in a background thread;
+        # -> the thread (call .stop() to unsubscribe)
+        def handler(message):
+            try:
+                callback(_to_str(message["data"]))
+            except Exception:
+                pass
+
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: handler})
+        return pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    # ------------- startup scan marker -------------
+    # scans: node URL -> token of the last scan it published. A token that does not match the
+    # node's manifest (e.g. Redis was flushed or the node left) forces a full publish.
+    def get_scan_marker(self, address: str):
+        val = self.redis.hget("scans", address)
+        return _to_str(val) if val is not None else None
+
+    def set_scan_marker(self, address: str, token: str):
+        return self.redis.hset("scans", address, token)
+
+    def clear_scan_marker(self, address: str):
+        return self.redis.hdel("scans", address)
+
+    def unindexed_paths(
+        self, paths: list, address: str, batch: int = HOST_BATCH
+    ) -> list:
+        # Paths missing from `address`'s host index, e.g. because another node removed the
+        # location meanwhile. One pipelined round trip of SMISMEMBERs.
+        norm = [self._norm(p) for p in paths]
+        if not norm:
+            return []
+        reader = self.redis.pipeline(transaction=False)
+        for i in range(0, len(norm), batch):
+            reader.smismember(self._host_key(address), norm[i : i + batch])
+        flags = [f for chunk in reader.execute() for f in chunk]
+        return [p for p, present in zip(paths, flags) if not present]
+
+    def apply_inode_updates(self, updates: dict, address: str):
+        # Batched form of set_metadata/add_to_dir/add_location used by the deferred write path.
+        # updates: path -> {"meta": dict | None, "dir": (parent, name) | None, "location": bool}
+        migrated = False
+        while True:
+            pipe = self._pipeline()
+            keys = []
+            for path, u in updates.items():
+                p = self._norm(path)
+                if u.get("meta"):
+                    self._queue_set_metadata(pipe, p, u["meta"])
+                    keys.append(self._inode_key(p))
+                if u.get("dir"):
+                    parent, name = u["dir"]
+                    pipe.zadd(self._dir_key(parent), {name: 0})
+                    keys.append(self._dir_key(parent))
+                if u.get("location"):
+                    pipe.sadd(self._loc_key(p), address)
+                    pipe.sadd(self._host_key(address), p)
+                    keys.append(self._loc_key(p))
             try:
-                pipe.watch(key)
-                current = pipe.hget(key, "locations")
-                if not current:
-                    pipe.unwatch()
-                    return False
-                txt = (
-                    current.decode()
-                    if isinstance(current, (bytes, bytearray))
-                    else str(current)
-                )
-                parts = [x for x in txt.split(";") if x]
-                if address not in parts:
-                    pipe.unwatch()
-                    return False
-                parts = [x for x in parts if x != address]
-                new_val = ";".join(parts)
-                pipe.multi()
-                pipe.hset(key, "locations", new_val)
                 pipe.execute()
+                self._forget(*keys)
                 return True
-            except redis.WatchError:
-                continue
+            except redis.ResponseError as e:
+                # Parent dir still stored as a legacy set: migrate and retry
+                if "WRONGTYPE" not in str(e) or migrated:
+                    raise
+                migrated = True
+                for u in updates.values():
+                    if u.get("dir"):
+                        self._migrate_dir_key(self._dir_key(u["dir"][0]))
             finally:
-                try:
-                    pipe.reset()
-                except Exception:
-                    pass
+                pipe.reset()
+
+    # ------------- directory index ops -------------
+    # dir:/path is a sorted set with all scores 0, i.e. ordered by name, so listings can be
+    # paginated with ZRANGE. Older deployments stored a plain set; those keys are converted
+    # on first use (or in bulk by migrate_dir_index).
+    def _migrate_dir_key(self, key) -> bool:
+        if self.cluster:
+            return False  # no legacy keys; WATCH is not available either
+        pipe = self.redis.pipeline()
+        try:
+            pipe.watch(key)
+            if pipe.type(key) not in (b"set", "set"):
+                return False
+            members = pipe.smembers(key)
+            pipe.multi()
+            pipe.delete(key)
+            if members:
+                pipe.zadd(key, {m: 0 for m in members})
+            pipe.execute()
+            return True
+        except redis.WatchError:
+            return False
+        finally:
+            pipe.reset()
+
+    def _dir_op(self, key, fn, *args):
+        try:
+            return fn(key, *args)
+        except redis.ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            self._migrate_dir_key(key)
+            return fn(key, *args)
+
+    def migrate_dir_index(self) -> int:
+        if self.cluster:
+            return 0
+        migrated = 0
+        for key in self.redis.scan_iter(match="dir:*", count=1000, _type="set"):
+            if self._migrate_dir_key(key):
+                migrated += 1
+        return migrated
+
+    def _dir_write(self, key, fn, *args):
+        try:
+            return self._dir_op(key, fn, *args)
+        finally:
+            self._forget(key)
+
+    def _dir_range(self, key, start: int, end: int) -> list:
+        # ZRANGE through the near-cache, which keeps each range of a listing separately
+        hit, page = self._near_get(key, (start, end))
+        if hit:
+            return list(page)
+        seq = self._near_seq()
+        page = self._dir_op(key, self.redis.zrange, start, end)
+        self._near_put(key, page, seq, (start, end))
+        return page
 
-    # ------------- directory set ops -------------
     def add_to_dir(self, dir_path, item):
-        return self.redis.sadd(self._dir_key(dir_path), item)
+        return self._dir_write(
+            self._dir_key(dir_path), lambda k, i: self.redis.zadd(k, {i: 0}), item
+        )
 
     def remove_from_dir(self, dir_path, item):
-        return self.redis.srem(self._dir_key(dir_path), item)
+        return self._dir_write(self._dir_key(dir_path), self.redis.zrem, item)
 
     def get_dir(self, dir_path):
-        return self.redis.smembers(self._dir_key(dir_path))
+        return self._dir_range(self._dir_key(dir_path), 0, -1)
+
+    def _dir_range_after(self, key, after, count: int) -> list:
+        # Up to `count` names sorting after `after` (None: from the start). Members all
+        # score 0, so ZRANGEBYLEX walks them by name: a cursor that does not shift when
+        # entries are added or removed in front of it, unlike a rank.
+        sub = ("after", after, count)
+        hit, page = self._near_get(key, sub)
+        if hit:
+            return list(page)
+        seq = self._near_seq()
+        low = "-" if after is None else "(" + after
+        page = self._dir_op(key, self.redis.zrangebylex, low, "+", 0, count)
+        self._near_put(key, page, seq, sub)
+        return page
+
+    def iter_dir(self, dir_path, after=None, page_size: int = DIR_PAGE_SIZE):
+        # Yield entry names in order, after the name `after`, one bounded page at a time
+        for page in self._dir_pages(self._dir_key(dir_path), after, page_size):
+            yield from page
+
+    def iter_dir_plus(self, dir_path, after=None, page_size: int = DIR_PAGE_SIZE):
+        # iter_dir with each entry's decoded metadata (None if missing): (name, meta).
+        # Two round trips per page: the ZRANGEBYLEX and one pipeline over the inodes.
+        base = self._norm(dir_path).rstrip("/")
+        for page in self._dir_pages(self._dir_key(dir_path), after, page_size):
+            names = [_to_str(raw) for raw in page]
+            metas = self.get_stat_many([base + "/" + n for n in names])
+            for name in names:
+                yield name, metas[self._norm(base + "/" + name)]
+
+    def _dir_pages(self, key, after, page_size: int):
+        while True:
+            page = self._dir_range_after(key, after, page_size)
+            yield page
+            if len(page) < page_size:
+                return
+            after = _to_str(page[-1])
 
     def remove_dir(self, dir_path):
-        return self.redis.delete(self._dir_key(dir_path))
+        return self._dir_write(self._dir_key(dir_path), self.redis.delete)
 
     # ------------- helper for random location selection -------------
     def random_location(self, path: str):
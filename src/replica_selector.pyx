@@ -0,0 +1,133 @@
+# cython: language_level=3
+import random
+import threading
+import time
+
+EWMA_ALPHA = 0.2  # weight of the newest sample in latency/error averages
+DEFAULT_LATENCY = 0.005  # seconds assumed for peers without samples yet
+ERROR_PENALTY = 10.0  # score multiplier per unit of error rate
+TIE_TOLERANCE = 0.1  # scores within 10% are treated as equal
+BREAKER_THRESHOLD = 5  # consecutive failures that open a peer's circuit
+BREAKER_COOLDOWN = 5.0  # seconds an open circuit rejects requests before one trial
+
+
+class PeerStats:
+    # Per-peer request statistics, updated by GrpcClient around every RPC, and the peer's
+    # circuit breaker: after BREAKER_THRESHOLD consecutive failures the peer is skipped for
+    # BREAKER_COOLDOWN seconds, then a single trial request decides whether it closes again.
+    def __init__(self):
+        self.latency = None  # EWMA seconds
+        self.error_rate = 0.0  # EWMA of failures (0..1)
+        self.inflight = 0
+        self.requests = 0
+        self.failures = 0  # consecutive
+        self._open_until = 0.0
+        self._trial = False  # half-open request in flight
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        # Whether requests may be sent (closed circuit, or cooldown over and no trial yet)
+        with self._lock:
+            if self.failures < BREAKER_THRESHOLD:
+                return True
+            return not self._trial and time.monotonic() >= self._open_until
+
+    def circuit(self) -> str:
+        with self._lock:
+            if self.failures < BREAKER_THRESHOLD:
+                return "closed"
+            if self._trial or time.monotonic() >= self._open_until:
+                return "half-open"
+            return "open"
+
+    def begin(self):
+        with self._lock:
+            self.inflight += 1
+            if self.failures >= BREAKER_THRESHOLD:
+                self._trial = True
+
+    def end(self, elapsed, ok=True):
+        with self._lock:
+            self.inflight = max(0, self.inflight - 1)
+            self.requests += 1
+            if ok and elapsed is not None:
+                if self.latency is None:
+                    self.latency = elapsed
+                else:
+                    self.latency += EWMA_ALPHA * (elapsed - self.latency)
+            self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+            self._trial = False
+            if ok:
+                self.failures = 0
+            else:
+                self.failures += 1
+                if self.failures >= BREAKER_THRESHOLD:
+                    self._open_until = time.monotonic() + BREAKER_COOLDOWN
+
+    def score(self) -> float:
+        # Expected cost of sending one more request to this peer; lower is better
+        latency = DEFAULT_LATENCY if self.latency is None else self.latency
+        return latency * (1 + self.inflight) * (1 + ERROR_PENALTY * self.error_rate)
+
+    def snapshot(self) -> dict:
+        return {
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "inflight": self.inflight,
+            "requests": self.requests,
+            "circuit": self.circuit(),
+        }
+
+
+class ReplicaSelector:
+    # Power-of-two-choices over replica candidates using PeerStats scores. Near-equal scores
+    # are broken by topology (same zone as this node first) and then self-locality.
+    def __init__(self, self_url: str, zone: str | None = None):
+        self.self_url = self_url
+        self.zone = zone
+        self._stats: dict[str, PeerStats] = {}
+        self._zones: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def stats_for(self, addr: str) -> PeerStats:
+        with self._lock:
+            st = self._stats.get(addr)
+            if st is None:
+                st = self._stats[addr] = PeerStats()
+            return st
+
+    def set_zones(self, zones: dict):
+        with self._lock:
+            self._zones = dict(zones)
+
+    def _key(self, addr: str):
+        return (
+            0 if self.zone and self._zones.get(addr) == self.zone else 1,
+            0 if addr == self.self_url else 1,
+        )
+
+    def _better(self, a: str, b: str) -> str:
+        sa, sb = self.stats_for(a).score(), self.stats_for(b).score()
+        if abs(sa - sb) <= TIE_TOLERANCE * max(sa, sb):
+            return a if self._key(a) <= self._key(b) else b
+        return a if sa < sb else b
+
+    def choose(self, candidates):
+        candidates = list(candidates)
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        a, b = random.sample(candidates, 2)
+        return self._better(a, b)
+
+    def rank(self, candidates) -> list:
+        # All candidates ordered best first (placement of new replicas)
+        return sorted(
+            candidates, key=lambda a: (self.stats_for(a).score(), self._key(a))
+        )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            items = list(self._stats.items())
+        return {addr: st.snapshot() for addr, st in items}
@@ -0,0 +1,251 @@
+# cython: language_level=3
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+REPLICATION_FACTOR = 1  # copies of each file, the writer's own included
+REPLICATION_WORKERS = 4
+REPLICATION_CHUNK = 1024 * 1024  # bytes read from disk per streamed chunk
+MAX_TRACKED_COPIES = 100000  # files whose full copies on peers are remembered
+DRAIN_TIMEOUT = 30.0  # seconds shutdown waits for running replication jobs
+
+
+class Replicator:
+    # Background replication of locally written files. Writes only record dirty extents;
+    # when a file is closed its extents are shipped to the peers already holding a copy,
+    # and whole-file copies are pushed to new peers until the replication factor (nearest
+    # per-directory override in Redis, else the volume default) is met. Locations in Redis
+    # are updated once a peer acknowledged the copy (the server fsyncs before replying).
+    def __init__(
+        self,
+        client,
+        redis_client,
+        root_path: str,
+        factor: int = REPLICATION_FACTOR,
+        workers: int = REPLICATION_WORKERS,
+    ):
+        self.client = client
+        self.redis_client = redis_client
+        self.root_path = root_path
+        self.factor = factor
+        self.logger = logging.getLogger(__name__)
+        self._dirty: dict[str, list] = {}  # path -> merged [start, end) extents
+        self._running: set[str] = set()
+        self._again: set[str] = set()  # closed again while a job was running
+        # path -> peers known to hold a full on-disk copy (this node shipped it)
+        self._copies: "OrderedDict[str, set]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)  # notified when a job finishes
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="replicator"
+        )
+
+    # ------------- helpers -------------
+    def _full_path(self, path: str) -> str:
+        return os.path.join(self.root_path, path.lstrip("/"))
+
+    def _factor(self, path: str) -> int:
+        try:
+            n = self.redis_client.get_replication_factor(path)
+            if n is not None:
+                return n
+        except Exception:
+            pass
+        return self.factor
+
+    def _read_extents(self, fd: int, extents: list, size: int, sent: list):
+        # Lazily read the extents for a WriteFile stream, counting bytes in `sent`
+        for start, end in extents:
+            end = min(end, size)
+            off = start
+            while off < end:
+                data = os.pread(fd, min(REPLICATION_CHUNK, end - off), off)
+                if not data:
+                    break
+                sent[0] += len(data)
+                yield off, data
+                off += len(data)
+
+    def _ship(self, addr: str, path: str, full: str, extents: list, size: int) -> bool:
+        sent = [0]
+        with open(full, "rb") as f:
+            chunks = self._read_extents(f.fileno(), extents, size, sent)
+            written = self.client.write_file(path, chunks, addr=addr)
+        if written != sent[0]:
+            return False
+        # Extents only grow a copy; also match the writer's size (truncates, short files)
+        return self.client.truncate(path, size, addr=addr) is True
+
+    def _has_copy(self, path: str, addr: str) -> bool:
+        with self._lock:
+            return addr in self._copies.get(path, ())
+
+    def _set_copy(self, path: str, addr: str, present: bool):
+        with self._lock:
+            peers = self._copies.pop(path, set())
+            if present:
+                peers.add(addr)
+            else:
+                peers.discard(addr)
+            if peers:
+                self._copies[path] = peers
+            while len(self._copies) > MAX_TRACKED_COPIES:
+                self._copies.popitem(last=False)
+
+    def _replicate(self, path: str, extents: list):
+        full = self._full_path(path)
+        try:
+            local_size = os.stat(full).st_size
+        except OSError:
+            return  # removed or renamed before it was shipped
+        locs = self.redis_client.get_locations(path)
+        meta = self.redis_client.get_stat(path)
+        # Whole-file copies and truncates overwrite the peers' data with this node's copy:
+        # only send them from a copy Redis lists here and whose size is the inode's
+        if self.client.url not in locs or not meta or meta["st_size"] != local_size:
+            self.logger.warning(
+                "Not replicating %s: local copy is not authoritative", path
+            )
+            with self._lock:
+                # Peers may have missed these extents: the next run ships whole files
+                self._copies.pop(path, None)
+            return
+        size = meta["st_size"]
+        replicas = [l for l in locs if l != self.client.url]
+        held = 0
+        for addr in replicas:
+            # Existing copies must receive the new data or stop being advertised. Extents
+            # only patch a full copy this node shipped; other holders (e.g. a peer that
+            # just cached the file) get the whole file, since the server creates missing
+            # files and would otherwise keep a sparse copy holding only the extents.
+            ship = extents if self._has_copy(path, addr) else [(0, size)]
+            try:
+                ok = self._ship(addr, path, full, ship, size)
+            except Exception as e:
+                self.logger.debug("Replicating %s to %s failed: %s", path, addr, e)
+                ok = False
+            self._set_copy(path, addr, ok)
+            if ok:
+                held += 1
+            else:
+                self.logger.warning("Dropping stale replica of %s on %s", path, addr)
+                try:
+                    self.redis_client.remove_location(path, addr)
+                except Exception:
+                    pass
+        need = self._factor(path) - 1 - held
+        if need <= 0:
+            return
+        for addr in self.client.replica_candidates(exclude=locs):
+            if need <= 0:
+                break
+            try:
+                ok = self._ship(addr, path, full, [(0, size)], size)
+            except Exception as e:
+                self.logger.debug("Copying %s to %s failed: %s", path, addr, e)
+                ok = False
+            if ok:
+                self._set_copy(path, addr, True)
+                try:
+                    self.redis_client.add_location(path, addr)
+                    need -= 1
+                except Exception:
+                    pass
+        if need > 0:
+            self.logger.warning("%s is under-replicated by %d copies", path, need)
+
+    def _run(self, path: str):
+        while True:
+            with self._lock:
+                extents = self._dirty.pop(path, None)
+            if extents is not None:
+                try:
+                    self._replicate(path, extents)
+                except Exception as e:
+                    self.logger.warning("Replication of %s failed: %s", path, e)
+            with self._lock:
+                if path not in self._again:
+                    self._running.discard(path)
+                    self._idle.notify_all()
+                    return
+                self._again.discard(path)
+
+    # ------------- public API -------------
+    def mark_dirty(self, path: str, offset: int, size: int):
+        # Record a written range; zero-sized marks register the file (create, truncate)
+        with self._lock:
+            extents = self._dirty.setdefault(path, [])
+            if size <= 0:
+                return
+            start, end = offset, offset + size
+            merged = []
+            for s, e in extents:
+                if e < start or s > end:
+                    merged.append((s, e))
+                else:
+                    start, end = min(s, start), max(e, end)
+            merged.append((start, end))
+            merged.sort()
+            self._dirty[path] = merged
+
+    def schedule(self, path: str):
+        # Ship the file's pending extents in the background (called on close)
+        with self._lock:
+            if path not in self._dirty:
+                return
+            if path in self._running:
+                self._again.add(path)
+                return
+            self._running.add(path)
+        try:
+            self._pool.submit(self._run, path)
+        except RuntimeError:
+            # Pool shut down (unmounting)
+            with self._lock:
+                self._running.discard(path)
+                self._idle.notify_all()
+
+    def forget(self, path: str):
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            for p in [p for p in self._dirty if p == path or p.startswith(prefix)]:
+                del self._dirty[p]
+            for p in [p for p in self._copies if p == path or p.startswith(prefix)]:
+                del self._copies[p]
+
+    def rename(self, old_path: str, new_path: str):
+        prefix = old_path.rstrip("/") + "/"
+        with self._lock:
+            for p in [p for p in self._dirty if p == old_path or p.startswith(prefix)]:
+                self._dirty[new_path + p[len(old_path) :]] = self._dirty.pop(p)
+            for p in [p for p in self._copies if p == old_path or p.startswith(prefix)]:
+                self._copies[new_path + p[len(old_path) :]] = self._copies.pop(p)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._dirty)
+
+    def drain(self, timeout: float = DRAIN_TIMEOUT) -> bool:
+        # Wait for scheduled and running jobs; False if some were still busy at the timeout
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._running:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._idle.wait(left)
+        return True
+
+    def close(self, timeout: float = DRAIN_TIMEOUT):
+        # Unmount: finish shipping closed files before this node leaves the cluster
+        if not self.drain(timeout):
+            self.logger.warning(
+                "Replication still running after %.0fs, abandoning it", timeout
+            )
+        self.shutdown()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,230 @@
+# cython: language_level=3
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from redis_client import STAT_FLOAT_FIELDS, STAT_INT_FIELDS
+
+SCAN_WORKERS = 8  # concurrent scandir/lstat workers
+PUBLISH_BATCH = 1000  # paths per Redis pipeline
+PROGRESS_EVERY = 100000  # log scan progress every this many entries
+MANIFEST_VERSION = 2  # 2: publishes also fill the per-host location index
+STATE_DIR = os.environ.get("MULTICLOUD_FS_STATE_DIR", "/tmp/multicloudfs_state")
+
+# Manifest rows store the stat fields in this order, then is_dir
+_FIELDS = STAT_INT_FIELDS + STAT_FLOAT_FIELDS
+_ATIME = _FIELDS.index("st_atime")
+
+
+def _row(st, is_dir: bool) -> list:
+    return [getattr(st, k) for k in _FIELDS] + [is_dir]
+
+
+def _changed(old, new) -> bool:
+    # Reads only move atime; that alone is not worth republishing
+    if old is None or len(old) != len(new):
+        return True
+    return any(a != b for i, (a, b) in enumerate(zip(old, new)) if i != _ATIME)
+
+
+class Scanner:
+    # Startup inventory of root_path. The tree is walked with scandir on a thread pool and
+    # compared with the manifest persisted by the previous run, so only new, changed and
+    # removed paths are published to Redis, in pipelined batches. The manifest is trusted
+    # only while the marker it recorded in Redis is still there.
+    def __init__(
+        self,
+        root_path: str,
+        redis_client,
+        url: str,
+        manifest_path: str | None = None,
+        workers: int = SCAN_WORKERS,
+        batch: int = PUBLISH_BATCH,
+    ):
+        self.root_path = os.path.abspath(root_path)
+        self.redis_client = redis_client
+        self.url = url
+        self.manifest_path = manifest_path or os.path.join(
+            STATE_DIR, "manifest-" + url.replace(":", "_").replace("/", "_") + ".json"
+        )
+        self.workers = workers
+        self.batch = batch
+        self.logger = logging.getLogger(__name__)
+        self.entries: dict[str, list] = {}  # path -> manifest row of the last scan
+        self.metrics: dict[str, float] = {}
+
+    # ------------- scan -------------
+    def _scan_dir(self, rel: str):
+        # -> ({path: row}, [sub-directory paths])
+        rows, subdirs = {}, []
+        try:
+            with os.scandir(self.root_path + (rel if rel != "/" else "")) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    path = (rel if rel != "/" else "") + "/" + entry.name
+                    rows[path] = _row(st, is_dir)
+                    if is_dir:
+                        subdirs.append(path)
+        except OSError as e:
+            self.logger.warning("Cannot scan %s: %s", rel, e)
+        return rows, subdirs
+
+    def scan(self) -> dict:
+        start = time.monotonic()
+        rows = {"/": _row(os.lstat(self.root_path), True)}
+        reported = 0
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="scan"
+        ) as pool:
+            pending = {pool.submit(self._scan_dir, "/")}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    found, subdirs = fut.result()
+                    rows.update(found)
+                    for d in subdirs:
+                        pending.add(pool.submit(self._scan_dir, d))
+                if len(rows) - reported >= PROGRESS_EVERY:
+                    reported = len(rows)
+                    self.logger.info(
+                        "Scanned %d entries in %.1fs",
+                        reported,
+                        time.monotonic() - start,
+                    )
+        self.metrics["scan_seconds"] = time.monotonic() - start
+        self.metrics["entries"] = len(rows)
+        return rows
+
+    # ------------- manifest -------------
+    def _load_manifest(self):
+        # -> (token, rows) of the previous run, or (None, {}) when unusable
+        try:
+            with open(self.manifest_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None, {}
+        if (
+            data.get("version") != MANIFEST_VERSION
+            or data.get("root") != self.root_path
+            or data.get("url") != self.url
+        ):
+            return None, {}
+        return data.get("token"), data.get("entries", {})
+
+    def _save_manifest(self, token: str, rows: dict):
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "root": self.root_path,
+                    "url": self.url,
+                    "token": token,
+                    "entries": rows,
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, self.manifest_path)
+
+    # ------------- publish -------------
+    def _publish(self, paths: list, rows: dict):
+        for i in range(0, len(paths), self.batch):
+            updates = {}
+            for p in paths[i : i + self.batch]:
+                row = rows[p]
+                meta = dict(zip(_FIELDS, row))
+                meta["is_dir"] = row[-1]
+                updates[p] = {
+                    "meta": meta,
+                    "dir": os.path.split(p) if p != "/" else None,
+                    "location": not row[-1],
+                }
+            self.redis_client.apply_inode_updates(updates, self.url)
+            done = min(i + self.batch, len(paths))
+            if done % PROGRESS_EVERY < self.batch or done == len(paths):
+                self.logger.info("Published %d/%d changed entries", done, len(paths))
+
+    def _unindexed(self, paths: list, rows: dict) -> list:
+        files = [p for p in paths if not rows[p][-1]]
+        try:
+            missing = self.redis_client.unindexed_paths(files, self.url)
+        except Exception as e:
+            self.logger.warning("Cannot check published locations: %s", e)
+            return files
+        if missing:
+            self.logger.info("%d unchanged files lost their location", len(missing))
+        return missing
+
+    def _unpublish(self, paths: list, old: dict):
+        files = [p for p in paths if not old[p][-1]]
+        for i in range(0, len(files), self.batch):
+            self.redis_client.remove_locations(files[i : i + self.batch], self.url)
+
+    # ------------- public API -------------
+    def run(self) -> list[str]:
+        # Scan, publish the differences and persist the new manifest; -> local file paths
+        start = time.monotonic()
+        token, prev = self._load_manifest()
+        marker = None
+        try:
+            marker = self.redis_client.get_scan_marker(self.url)
+        except Exception:
+            pass
+        full = token is None or marker != token
+        old = {} if full else prev
+        rows = self.scan()
+        changed = [p for p, row in rows.items() if _changed(old.get(p), row)]
+        removed = [p for p in prev if p not in rows]
+        if not full:
+            # The marker only proves this node's last publish happened: other nodes may
+            # have removed some of its locations since (dead-peer cleanup, lost or stale
+            # replicas). Republish unchanged files that are no longer indexed.
+            seen = set(changed)
+            changed += self._unindexed([p for p in rows if p not in seen], rows)
+        publish_start = time.monotonic()
+        self._publish(changed, rows)
+        self._unpublish(removed, prev)
+        token = uuid.uuid4().hex
+        try:
+            self._save_manifest(token, rows)
+            self.redis_client.set_scan_marker(self.url, token)
+        except Exception as e:
+            self.logger.warning("Could not persist scan manifest: %s", e)
+        self.entries = rows
+        self.metrics.update(
+            full=full,
+            changed=len(changed),
+            removed=len(removed),
+            publish_seconds=time.monotonic() - publish_start,
+            total_seconds=time.monotonic() - start,
+        )
+        self.logger.info(
+            "Startup scan: %d entries in %.1fs, %s publish of %d changed / %d removed "
+            "in %.1fs",
+            len(rows),
+            self.metrics["scan_seconds"],
+            "full" if full else "incremental",
+            len(changed),
+            len(removed),
+            self.metrics["publish_seconds"],
+        )
+        return self.files()
+
+    def files(self) -> list[str]:
+        return [p for p, row in self.entries.items() if not row[-1]]
+
+    def invalidate(self):
+        # Force a full publish next time (this node's locations were removed from Redis)
+        try:
+            self.redis_client.clear_scan_marker(self.url)
+        except Exception:
+            pass